@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Offline benchmark harness for the CPU-bound post-processing stages.
+
+No network calls: every stage runs on the real corpus (assets/data/word,
+assets/data/word_ex) and on synthetic corpora scaled 10x / 100x, where each
+topic's list is repeated with suffixed `en` values so dedupe can't collapse it.
+Scaled inputs are built lazily one topic at a time, so 100x stays within memory.
+
+Stages:
+  read_word_list       WordsFromWordExGenerator.read_word_list over word_ex files
+  extract_items        EmptyTopicRegenerator._extract_items (gpt5.py) over CSV output
+  normalize_item       WordsFromWordExGenerator._normalize_item over every record
+  json_dump_pretty     json.dump(indent=2, ensure_ascii=False), as save_topic_words
+  json_dump_compact    json.dump with compact separators, for comparison
+
+For each stage/scale:
+  - timing: --rounds timed rounds, pytest-benchmark style stats
+    (min / max / mean / stddev / median, ops = chunks per second);
+  - allocations: one extra round under tracemalloc (per-chunk peak above the
+    starting point, and bytes still held after each call);
+  - profiling: --profile DIR writes one cProfile .prof per stage/scale and
+    prints the top functions.
+
+Baselines follow pytest-benchmark: --save NAME stores results under
+.benchmarks/NAME.json, --compare NAME prints deltas against it and
+--compare-fail mean:10% exits non-zero on a regression.
+
+CLI examples (from project root):
+  python md/bench_pipeline.py --scales 1,10,100 --rounds 5 --save before
+  python md/bench_pipeline.py --scales 1,10 --compare before --compare-fail mean:10%
+  python md/bench_pipeline.py --stages normalize_item --scales 10 --profile /tmp/prof
+"""
+
+import io
+import os
+import re
+import sys
+import json
+import time
+import pstats
+import shutil
+import cProfile
+import platform
+import argparse
+import tempfile
+import statistics
+import tracemalloc
+from typing import List, Dict, Any, Callable, Iterable, Optional, Tuple
+
+from generate_words_from_word_ex import WordsFromWordExGenerator
+from gpt5 import EmptyTopicRegenerator
+
+
+class PipelineBenchmark:
+    def __init__(self,
+                 word_dir: str = "assets/data/word",
+                 word_ex_dir: str = "assets/data/word_ex",
+                 topics_file: str = "assets/data/topics.json",
+                 rounds: int = 3,
+                 profile_dir: Optional[str] = None,
+                 profile_top: int = 15):
+        self.word_dir = word_dir
+        self.word_ex_dir = word_ex_dir
+        self.rounds = rounds
+        self.profile_dir = profile_dir
+        self.profile_top = profile_top
+
+        self._tmp = tempfile.mkdtemp(prefix="bvo_bench_")
+        self.gen = WordsFromWordExGenerator(topics_file=topics_file, word_ex_dir=word_ex_dir,
+                                            output_dir=os.path.join(self._tmp, "out"))
+        self.regen = EmptyTopicRegenerator(topics_file=topics_file)
+        self._corpus: Optional[List[Tuple[str, str, List[Dict[str, Any]]]]] = None
+
+        self.stages: Dict[str, Tuple[Callable[[int], Iterable[Any]], Callable[[Any], Any]]] = {
+            "read_word_list": (self._word_ex_files, self.gen.read_word_list),
+            "extract_items": (self._model_outputs, self.regen._extract_items),
+            "normalize_item": (self._topic_records, self._normalize_topic),
+            "json_dump_pretty": (self._topic_items, self._dump_pretty),
+            "json_dump_compact": (self._topic_items, self._dump_compact),
+        }
+
+    def close(self):
+        shutil.rmtree(self._tmp, ignore_errors=True)
+
+    # ---------------- Inputs ----------------
+    def _load_corpus(self) -> List[Tuple[str, str, List[Dict[str, Any]]]]:
+        if self._corpus is None:
+            corpus = []
+            for fname in sorted(os.listdir(self.word_dir)):
+                if not fname.endswith(".json"):
+                    continue
+                with open(os.path.join(self.word_dir, fname), "r", encoding="utf-8") as f:
+                    items = json.load(f)
+                m = re.match(r"^\d+_([\w\-]+)\.json$", fname)
+                topic_id = m.group(1) if m else fname[:-5]
+                level = items[0].get("level", "BASIC") if items else "BASIC"
+                corpus.append((topic_id, level, items))
+            self._corpus = corpus
+        return self._corpus
+
+    @staticmethod
+    def _scale_list(values: List[str], scale: int) -> List[str]:
+        if scale <= 1:
+            return values
+        return values + [f"{v} {k}" for k in range(1, scale) for v in values]
+
+    def _word_ex_texts(self, scale: int) -> Iterable[str]:
+        for path in self.gen.list_word_ex_files():
+            with open(path, "r", encoding="utf-8") as f:
+                values = [t.strip() for t in f.read().split(",") if t.strip()]
+            yield ", ".join(self._scale_list(values, scale))
+
+    def _word_ex_files(self, scale: int) -> List[str]:
+        if scale <= 1:
+            return self.gen.list_word_ex_files()
+        scaled_dir = os.path.join(self._tmp, f"word_ex_x{scale}")
+        if not os.path.isdir(scaled_dir):
+            os.makedirs(scaled_dir)
+            for path, text in zip(self.gen.list_word_ex_files(), self._word_ex_texts(scale)):
+                with open(os.path.join(scaled_dir, os.path.basename(path)), "w", encoding="utf-8") as f:
+                    f.write(text)
+        return [os.path.join(scaled_dir, f) for f in sorted(os.listdir(scaled_dir))]
+
+    def _model_outputs(self, scale: int) -> Iterable[str]:
+        # Shape of a typical model reply: a label line, then the CSV list
+        for text in self._word_ex_texts(scale):
+            yield "Here are the words:\nWords: " + text
+
+    def _topic_items(self, scale: int) -> Iterable[List[Dict[str, Any]]]:
+        for _, _, items in self._load_corpus():
+            if scale <= 1:
+                yield items
+            else:
+                yield items + [dict(it, en=f"{it.get('en', '')} {k}")
+                               for k in range(1, scale) for it in items]
+
+    def _topic_records(self, scale: int) -> Iterable[Tuple[str, str, List[Dict[str, Any]]]]:
+        for (topic_id, level, _), items in zip(self._load_corpus(), self._topic_items(scale)):
+            yield topic_id, level, items
+
+    # ---------------- Stage bodies ----------------
+    def _normalize_topic(self, payload: Tuple[str, str, List[Dict[str, Any]]]):
+        topic_id, level, items = payload
+        for it in items:
+            self.gen._normalize_item(it, topic_id, level)
+
+    @staticmethod
+    def _dump_pretty(items: List[Dict[str, Any]]):
+        with open(os.devnull, "w", encoding="utf-8") as f:
+            json.dump(items, f, ensure_ascii=False, indent=2)
+
+    @staticmethod
+    def _dump_compact(items: List[Dict[str, Any]]):
+        with open(os.devnull, "w", encoding="utf-8") as f:
+            json.dump(items, f, ensure_ascii=False, separators=(",", ":"))
+
+    # ---------------- Measurement ----------------
+    @staticmethod
+    def _timed_round(setup: Callable[[int], Iterable[Any]], fn: Callable[[Any], Any],
+                     scale: int) -> Tuple[float, int]:
+        """Time only the stage calls; building scaled inputs is excluded."""
+        elapsed, chunks = 0.0, 0
+        for payload in setup(scale):
+            t0 = time.perf_counter()
+            fn(payload)
+            elapsed += time.perf_counter() - t0
+            chunks += 1
+        return elapsed, chunks
+
+    @staticmethod
+    def _alloc_round(setup: Callable[[int], Iterable[Any]], fn: Callable[[Any], Any],
+                     scale: int) -> Dict[str, int]:
+        peak, total = 0, 0
+        tracemalloc.start()
+        try:
+            for payload in setup(scale):
+                tracemalloc.reset_peak()
+                base, _ = tracemalloc.get_traced_memory()
+                fn(payload)
+                current, chunk_peak = tracemalloc.get_traced_memory()
+                peak = max(peak, chunk_peak - base)
+                total += max(current - base, 0)
+        finally:
+            tracemalloc.stop()
+        return {"peak_bytes": peak, "retained_bytes": total}
+
+    def _profile_round(self, name: str, scale: int, setup: Callable[[int], Iterable[Any]],
+                       fn: Callable[[Any], Any]) -> str:
+        os.makedirs(self.profile_dir, exist_ok=True)
+        prof = cProfile.Profile()
+        for payload in setup(scale):
+            prof.enable()
+            fn(payload)
+            prof.disable()
+        path = os.path.join(self.profile_dir, f"{name}_x{scale}.prof")
+        prof.dump_stats(path)
+        out = io.StringIO()
+        pstats.Stats(prof, stream=out).sort_stats("cumulative").print_stats(self.profile_top)
+        print(out.getvalue())
+        return path
+
+    def bench_stage(self, name: str, scale: int) -> Dict[str, Any]:
+        setup, fn = self.stages[name]
+        self._timed_round(setup, fn, scale)  # warm-up (caches, scaled inputs on disk)
+        times, chunks = [], 0
+        for _ in range(self.rounds):
+            elapsed, chunks = self._timed_round(setup, fn, scale)
+            times.append(elapsed)
+        result: Dict[str, Any] = {
+            "name": name,
+            "scale": scale,
+            "chunks": chunks,
+            "stats": {
+                "min": min(times),
+                "max": max(times),
+                "mean": statistics.mean(times),
+                "stddev": statistics.stdev(times) if len(times) > 1 else 0.0,
+                "median": statistics.median(times),
+                "rounds": len(times),
+                "ops": chunks / statistics.mean(times) if statistics.mean(times) > 0 else 0.0,
+            },
+            "memory": self._alloc_round(setup, fn, scale),
+        }
+        if self.profile_dir:
+            result["profile"] = self._profile_round(name, scale, setup, fn)
+        return result
+
+    def run(self, stage_names: List[str], scales: List[int]) -> Dict[str, Any]:
+        benchmarks = []
+        for scale in scales:
+            for name in stage_names:
+                res = self.bench_stage(name, scale)
+                benchmarks.append(res)
+                s, m = res["stats"], res["memory"]
+                print(f"⏱️  {name:<18} x{scale:<4} mean {s['mean'] * 1000:9.2f} ms "
+                      f"± {s['stddev'] * 1000:7.2f} | min {s['min'] * 1000:9.2f} ms "
+                      f"| peak {m['peak_bytes'] / 1024:9.1f} KiB | {res['chunks']} chunks")
+        return {
+            "machine_info": {
+                "python": platform.python_version(),
+                "implementation": platform.python_implementation(),
+                "platform": platform.platform(),
+                "processor": platform.processor(),
+            },
+            "datetime": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "benchmarks": benchmarks,
+        }
+
+
+# ---------------- Baselines ----------------
+def save_baseline(results: Dict[str, Any], name: str, storage: str) -> str:
+    os.makedirs(storage, exist_ok=True)
+    path = os.path.join(storage, f"{name}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def compare_baseline(results: Dict[str, Any], name: str, storage: str,
+                     fail_expr: Optional[str] = None) -> bool:
+    """Print deltas vs a saved baseline. Returns False if --compare-fail is exceeded."""
+    with open(os.path.join(storage, f"{name}.json"), "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    base = {(b["name"], b["scale"]): b for b in baseline["benchmarks"]}
+
+    field, limit = "mean", None
+    if fail_expr:
+        m = re.match(r"^(min|max|mean|median):(\d+(?:\.\d+)?)%$", fail_expr)
+        if not m:
+            raise ValueError(f"Invalid --compare-fail expression: {fail_expr} (e.g. mean:10%)")
+        field, limit = m.group(1), float(m.group(2))
+
+    ok = True
+    print(f"\n📊 Compared with baseline '{name}' ({baseline.get('datetime', '?')}):")
+    for b in results["benchmarks"]:
+        old = base.get((b["name"], b["scale"]))
+        if old is None:
+            print(f"   {b['name']:<18} x{b['scale']:<4} (no baseline)")
+            continue
+        old_v, new_v = old["stats"][field], b["stats"][field]
+        delta = (new_v - old_v) / old_v * 100 if old_v else 0.0
+        mem_delta = b["memory"]["peak_bytes"] - old["memory"]["peak_bytes"]
+        flag = ""
+        if limit is not None and delta > limit:
+            flag = " ❌"
+            ok = False
+        print(f"   {b['name']:<18} x{b['scale']:<4} {field} {old_v * 1000:9.2f} → {new_v * 1000:9.2f} ms "
+              f"({delta:+6.1f}%) | peak {mem_delta / 1024:+9.1f} KiB{flag}")
+    return ok
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Benchmark the offline post-processing stages of the word pipeline.")
+    p.add_argument("--word-dir", default="assets/data/word")
+    p.add_argument("--word-ex-dir", default="assets/data/word_ex")
+    p.add_argument("--topics-file", default="assets/data/topics.json")
+    p.add_argument("--stages", default="", help="Comma-separated stage names (default: all).")
+    p.add_argument("--scales", default="1,10,100", help="Comma-separated corpus scale factors.")
+    p.add_argument("--rounds", type=int, default=3, help="Timed rounds per stage and scale (default: 3).")
+    p.add_argument("--profile", default="", help="Directory for cProfile output (enables profiling).")
+    p.add_argument("--storage", default=".benchmarks", help="Baseline directory (default: .benchmarks).")
+    p.add_argument("--save", default="", help="Save results as baseline NAME.")
+    p.add_argument("--compare", default="", help="Compare against baseline NAME.")
+    p.add_argument("--compare-fail", default="", help="Fail on regression, e.g. mean:10%%.")
+    p.add_argument("--json", default="", help="Also write the raw results to this path.")
+    return p.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    bench = PipelineBenchmark(
+        word_dir=args.word_dir,
+        word_ex_dir=args.word_ex_dir,
+        topics_file=args.topics_file,
+        rounds=args.rounds,
+        profile_dir=args.profile or None,
+    )
+    stage_names = [s.strip() for s in args.stages.split(",") if s.strip()] or list(bench.stages)
+    unknown = [s for s in stage_names if s not in bench.stages]
+    if unknown:
+        raise SystemExit(f"❌ Unknown stages: {', '.join(unknown)} (available: {', '.join(bench.stages)})")
+    scales = [int(x) for x in args.scales.split(",") if x.strip()]
+
+    try:
+        results = bench.run(stage_names, scales)
+    finally:
+        bench.close()
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    if args.save:
+        print(f"💾 Saved baseline: {save_baseline(results, args.save, args.storage)}")
+    if args.compare:
+        if not compare_baseline(results, args.compare, args.storage, args.compare_fail or None):
+            sys.exit(1)
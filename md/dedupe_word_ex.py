@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Find near-duplicate entries across all topic word lists in assets/data/word_ex.
+
+Exact lowercase dedupe (read_word_list / _extract_items) keeps variants such as
+"I'm" vs "I am", "apple" vs "apples" or "how's it going" vs "how is it going".
+Each of them costs its own enrichment call, so this script clusters them with
+character shingling + MinHash + LSH banding (sub-quadratic, NumPy vectorized).
+
+Output:
+  - Review report (JSON): one cluster per group of near-duplicates, with the
+    surface forms, where they occur and their pairwise similarity.
+  - Optional canonicalization map (JSON): {variant_lowercase: canonical_form},
+    consumed by generate_words_from_word_ex.py via --canonical-map. Only
+    contraction / quote / punctuation variants are mapped unless
+    --map-min-similarity is lowered; plural folds ("blues" / "blue") and fuzzy
+    clusters ("furnished" / "unfurnished") stay in the report for review.
+
+CLI example (from project root):
+  python md/dedupe_word_ex.py \
+    --word-ex-dir assets/data/word_ex \
+    --report word_ex_duplicates.json \
+    --canonical-map word_ex_canonical.json \
+    --threshold 0.8
+"""
+
+import os
+import re
+import json
+import zlib
+import argparse
+from collections import Counter, defaultdict
+from typing import List, Dict, Any, Tuple, Optional
+
+import numpy as np
+
+from generate_words_from_word_ex import list_word_ex_files, read_word_list
+from word_ids import surface_form
+
+
+# Mersenne prime used by the universal hash family h(x) = (a*x + b) mod p.
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+class WordExDeduplicator:
+    def __init__(self,
+                 word_ex_dir: str = "assets/data/word_ex",
+                 shingle_size: int = 3,
+                 num_perm: int = 128,
+                 bands: int = 32,
+                 threshold: float = 0.8,
+                 seed: int = 1):
+        if num_perm % bands != 0:
+            raise ValueError("num_perm must be divisible by bands.")
+        self.word_ex_dir = word_ex_dir
+        self.shingle_size = shingle_size
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+
+        rng = np.random.RandomState(seed)
+        # a, b < 2**32 so a*x + b never overflows uint64 for 32-bit shingle hashes
+        self.perm_a = rng.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self.perm_b = rng.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+    # ---------------- Normalization & shingling ----------------
+    @staticmethod
+    def _singularize(token: str) -> str:
+        if len(token) <= 3:
+            return token
+        if token.endswith("ies") and len(token) > 4:
+            return token[:-3] + "y"
+        if re.search(r"(ss|sh|ch|x|z)es$", token):
+            return token[:-2]
+        if token.endswith("s") and not token.endswith(("ss", "us", "is")):
+            return token[:-1]
+        return token
+
+    @staticmethod
+    def surface_form(text: str) -> str:
+        # Shared with word_ids.word_key, so mapped variants keep their word IDs
+        return surface_form(text)
+
+    def normalize(self, text: str) -> str:
+        # Looser key for clustering: also folds plurals, which is only a review hint
+        tokens = [self._singularize(tok) for tok in re.split(r"[\s-]+", self.surface_form(text)) if tok]
+        return " ".join(tokens)
+
+    def shingles(self, normalized: str) -> np.ndarray:
+        padded = f" {normalized} "
+        k = self.shingle_size
+        if len(padded) < k:
+            grams = {padded}
+        else:
+            grams = {padded[i:i + k] for i in range(len(padded) - k + 1)}
+        return np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams),
+                           dtype=np.uint64, count=len(grams))
+
+    # ---------------- MinHash & LSH ----------------
+    def minhash_signatures(self, shingle_sets: List[np.ndarray], perm_chunk: int = 16) -> np.ndarray:
+        """Return a (num_items, num_perm) signature matrix, vectorized over all items."""
+        lengths = np.array([len(s) for s in shingle_sets], dtype=np.int64)
+        flat = np.concatenate(shingle_sets)
+        offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        sig = np.empty((self.num_perm, len(shingle_sets)), dtype=np.uint64)
+        # Hash (perm_chunk, total_shingles) at a time to bound memory, then min per item segment
+        for start in range(0, self.num_perm, perm_chunk):
+            a = self.perm_a[start:start + perm_chunk, None]
+            b = self.perm_b[start:start + perm_chunk, None]
+            hashed = (a * flat[None, :] + b) % _MERSENNE_PRIME
+            hashed &= _MAX_HASH
+            sig[start:start + perm_chunk] = np.minimum.reduceat(hashed, offsets, axis=1)
+        return sig.T.astype(np.uint32)
+
+    def lsh_candidates(self, signatures: np.ndarray) -> set:
+        candidates = set()
+        for b in range(self.bands):
+            band = np.ascontiguousarray(signatures[:, b * self.rows:(b + 1) * self.rows])
+            # Group identical band rows: unique rows -> bucket ids
+            _, bucket_ids = np.unique(band, axis=0, return_inverse=True)
+            bucket_ids = bucket_ids.ravel()
+            order = np.argsort(bucket_ids, kind="stable")
+            sorted_ids = bucket_ids[order]
+            boundaries = np.flatnonzero(np.diff(sorted_ids)) + 1
+            for group in np.split(order, boundaries):
+                if len(group) < 2:
+                    continue
+                members = sorted(group.tolist())
+                for i in range(len(members)):
+                    for j in range(i + 1, len(members)):
+                        candidates.add((members[i], members[j]))
+        return candidates
+
+    @staticmethod
+    def _jaccard(a: np.ndarray, b: np.ndarray) -> float:
+        inter = np.intersect1d(a, b, assume_unique=True).size
+        union = a.size + b.size - inter
+        return inter / union if union else 1.0
+
+    # ---------------- Clustering ----------------
+    def find_clusters(self) -> Dict[str, Any]:
+        # Same file listing / tokenization as the --canonical-map consumer
+        files = list_word_ex_files(self.word_ex_dir)
+        # surface form (lowercase) -> occurrences / original casing counts
+        occurrences: Dict[str, List[str]] = defaultdict(list)
+        casings: Dict[str, Counter] = defaultdict(Counter)
+        for path in files:
+            fname = os.path.basename(path)
+            for item in read_word_list(path):
+                key = item.lower()
+                occurrences[key].append(fname)
+                casings[key][item] += 1
+
+        surfaces = sorted(occurrences.keys())
+        if not surfaces:
+            return {"files": len(files), "unique_items": 0, "clusters": []}
+
+        forms = [self.surface_form(s) for s in surfaces]
+        normalized = [self.normalize(s) for s in surfaces]
+        shingle_sets = [self.shingles(n) for n in normalized]
+        signatures = self.minhash_signatures(shingle_sets)
+
+        parent = list(range(len(surfaces)))
+
+        def find(x: int) -> int:
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        def union(x: int, y: int):
+            rx, ry = find(x), find(y)
+            if rx != ry:
+                parent[max(rx, ry)] = min(rx, ry)
+
+        # Identical normalized forms ("I'm" / "I am") are duplicates outright
+        by_norm: Dict[str, int] = {}
+        for i, n in enumerate(normalized):
+            if n in by_norm:
+                union(by_norm[n], i)
+            else:
+                by_norm[n] = i
+
+        pair_scores: Dict[Tuple[int, int], float] = {}
+        for i, j in self.lsh_candidates(signatures):
+            if normalized[i] == normalized[j]:
+                score = 1.0
+            else:
+                score = self._jaccard(shingle_sets[i], shingle_sets[j])
+            if score >= self.threshold:
+                pair_scores[(i, j)] = score
+                union(i, j)
+        for i, n in enumerate(normalized):
+            j = by_norm[n]
+            if i != j:
+                pair_scores[(min(i, j), max(i, j))] = 1.0
+
+        groups: Dict[int, List[int]] = defaultdict(list)
+        for i in range(len(surfaces)):
+            groups[find(i)].append(i)
+
+        clusters = []
+        for members in groups.values():
+            if len(members) < 2:
+                continue
+            canonical = self._pick_canonical([surfaces[m] for m in members], occurrences)
+            c_idx = surfaces.index(canonical)
+            member_set = set(members)
+            pairs = [
+                {"a": surfaces[i], "b": surfaces[j], "similarity": round(s, 3)}
+                for (i, j), s in sorted(pair_scores.items())
+                if i in member_set and j in member_set
+            ]
+            clusters.append({
+                "canonical": casings[canonical].most_common(1)[0][0],
+                "members": [
+                    {
+                        "text": casings[surfaces[m]].most_common(1)[0][0],
+                        "normalized": normalized[m],
+                        "files": sorted(set(occurrences[surfaces[m]])),
+                        "match": self._match_kind(forms[m], forms[c_idx], normalized[m], normalized[c_idx]),
+                        "similarity_to_canonical": round(
+                            1.0 if forms[m] == forms[c_idx]
+                            else self._jaccard(self.shingles(forms[m]), self.shingles(forms[c_idx])), 3),
+                    }
+                    for m in members
+                ],
+                "pairs": pairs,
+            })
+        clusters.sort(key=lambda c: (-len(c["members"]), c["canonical"].lower()))
+        return {
+            "files": len(files),
+            "unique_items": len(surfaces),
+            "threshold": self.threshold,
+            "clusters": clusters,
+        }
+
+    @staticmethod
+    def _pick_canonical(members: List[str], occurrences: Dict[str, List[str]]) -> str:
+        # Most widely used form wins; ties go to the shorter, then alphabetical form
+        return min(members, key=lambda s: (-len(occurrences[s]), len(s), s))
+
+    @staticmethod
+    def _match_kind(form: str, canonical_form: str, norm: str, canonical_norm: str) -> str:
+        if form == canonical_form:
+            return "form"  # contraction / quote / case / punctuation variant
+        if norm == canonical_norm:
+            return "folded"  # plural or hyphen fold; often a different word
+        return "fuzzy"
+
+    @staticmethod
+    def build_canonical_map(result: Dict[str, Any], min_similarity: float = 1.0) -> Dict[str, str]:
+        """By default only "form" variants (contractions, quotes, punctuation) are mapped.
+        Plural / hyphen folds ("blues" / "blue", "check-in" / "check in") often change the meaning,
+        so they stay in the report; lowering min_similarity maps them and fuzzy matches
+        too, by similarity of the surface forms — review the report before doing so."""
+        mapping: Dict[str, str] = {}
+        for cluster in result.get("clusters", []):
+            canonical = cluster["canonical"]
+            for member in cluster["members"]:
+                text = member["text"]
+                if member["match"] != "form" and (
+                        min_similarity >= 1.0 or member["similarity_to_canonical"] < min_similarity):
+                    continue
+                if text.lower() != canonical.lower():
+                    mapping[text.lower()] = canonical
+        return dict(sorted(mapping.items()))
+
+    # ---------------- Main ----------------
+    def run(self, report_path: str, canonical_map_path: Optional[str] = None,
+            map_min_similarity: float = 1.0) -> Dict[str, Any]:
+        result = self.find_clusters()
+        if not result["clusters"] and result["unique_items"] == 0:
+            print("❌ No topic files found in word_ex directory.")
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        dup_items = sum(len(c["members"]) for c in result["clusters"])
+        print(f"🔎 Scanned {result['files']} files, {result['unique_items']} unique items")
+        print(f"🧩 Found {len(result['clusters'])} clusters covering {dup_items} items → {report_path}")
+
+        if canonical_map_path:
+            mapping = self.build_canonical_map(result, map_min_similarity)
+            with open(canonical_map_path, "w", encoding="utf-8") as f:
+                json.dump(mapping, f, ensure_ascii=False, indent=2)
+            print(f"💾 Saved canonical map: {canonical_map_path} → {len(mapping)} entries")
+        return result
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Cluster near-duplicate items across word_ex lists (MinHash/LSH).")
+    p.add_argument("--word-ex-dir", default="assets/data/word_ex")
+    p.add_argument("--report", default="word_ex_duplicates.json", help="Path of the review report (JSON).")
+    p.add_argument("--canonical-map", default="", help="Optional path to write the canonicalization map (JSON).")
+    p.add_argument("--threshold", type=float, default=0.8, help="Minimum shingle Jaccard similarity (default: 0.8).")
+    p.add_argument("--map-min-similarity", type=float, default=1.0,
+                   help="Minimum similarity to the canonical form for a folded/fuzzy variant to enter "
+                        "the map (default: 1.0 = contraction/punctuation variants only).")
+    p.add_argument("--shingle-size", type=int, default=3)
+    p.add_argument("--num-perm", type=int, default=128)
+    p.add_argument("--bands", type=int, default=32)
+    return p.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    dedup = WordExDeduplicator(
+        word_ex_dir=args.word_ex_dir,
+        shingle_size=args.shingle_size,
+        num_perm=args.num_perm,
+        bands=args.bands,
+        threshold=args.threshold,
+    )
+    print(f"🔧 threshold={args.threshold} | shingle={args.shingle_size} | perm={args.num_perm} | bands={args.bands}")
+    dedup.run(args.report, args.canonical_map or None, args.map_min_similarity)
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Record-level delta packs between two versions of assets/data/word.
+
+Instead of shipping all topic JSON files after a regeneration, diff the old and
+new corpus keyed by (topic, en) and emit a compact, versioned delta pack:
+
+  {
+    "format": "bvo-word-delta", "version": 2,
+    "from": {"version": "...", "digest": "..."},
+    "to":   {"version": "...", "digest": "..."},
+    "topics": {
+      "<topic_id>": {
+        "file": "01_<topic_id>.json",          # target file name
+        "digest": "<sha256 of the file as apply writes it>",
+        "adds":    [ {full record}, ... ],
+        "updates": [ {"en": "<key>", "set": {field: value}, "unset": [field],
+                      "fields": [field, ...]} ],  # "fields" only for an odd key order
+        "deletes": [ "<key>", ... ],
+        "order":   [ "<key>", ... ],           # only when order can't be inferred
+        "field_order": [ field, ... ]          # only when kept records change key order
+      },
+      "<removed_topic_id>": null
+    }
+  }
+
+Keys are `en` lowercased with whitespace collapsed, so a casing/spacing change
+shows up as a field update of `en` rather than a delete + add.
+
+apply() rebuilds the target corpus from the base + pack, including the field
+order of every record; verify() checks that the bytes apply would write match
+the digests recorded in the pack.
+
+CLI examples (from project root):
+  python md/delta_pack.py diff --base old/word --target assets/data/word \
+    --from-version 2024.10 --to-version 2024.11 --out word_delta.json.gz
+  python md/delta_pack.py apply --base old/word --pack word_delta.json.gz --out new/word
+  python md/delta_pack.py verify --base old/word --pack word_delta.json.gz
+"""
+
+import os
+import re
+import gzip
+import json
+import hashlib
+import argparse
+from typing import List, Dict, Any, Tuple, Optional
+
+
+FORMAT_NAME = "bvo-word-delta"
+FORMAT_VERSION = 2  # v2: digests cover the written bytes, records keep field order
+
+# topic_id -> (file name, ordered [(key, record)])
+Corpus = Dict[str, Tuple[str, List[Tuple[str, Dict[str, Any]]]]]
+
+
+# ---------------- Corpus IO ----------------
+def record_key(record: Dict[str, Any]) -> str:
+    return re.sub(r"\s+", " ", str(record.get("en", ""))).strip().lower()
+
+
+def _topic_id_from_file(fname: str) -> str:
+    m = re.match(r"^(?:\d+_)?([\w\-]+)\.json$", fname)
+    return m.group(1) if m else os.path.splitext(fname)[0]
+
+
+def load_corpus(word_dir: str, strict: bool = False) -> Corpus:
+    """strict: raise on records a delta cannot reproduce (non-objects, duplicate keys)
+    instead of dropping them; used for the diff target."""
+    corpus: Corpus = {}
+    if not os.path.isdir(word_dir):
+        return corpus
+    for fname in sorted(os.listdir(word_dir)):
+        if not fname.endswith(".json"):
+            continue
+        with open(os.path.join(word_dir, fname), "r", encoding="utf-8") as f:
+            records = json.load(f)
+        topic_id = _topic_id_from_file(fname)
+        entries: List[Tuple[str, Dict[str, Any]]] = []
+        seen = set()
+        for n, rec in enumerate(records):
+            if not isinstance(rec, dict):
+                if strict:
+                    raise ValueError(f"{fname}: record {n} is not an object")
+                continue
+            key = record_key(rec)
+            if key in seen:
+                # Duplicate keys cannot be addressed by a delta; first one wins
+                if strict:
+                    raise ValueError(f"{fname}: duplicate key '{key}' (record {n}); "
+                                     f"dedupe the topic before diffing")
+                print(f"⚠️  Duplicate '{key}' in {fname} → keeping first")
+                continue
+            seen.add(key)
+            entries.append((key, rec))
+        corpus[topic_id] = (fname, entries)
+    return corpus
+
+
+def serialize_topic(entries: List[Tuple[str, Dict[str, Any]]]) -> bytes:
+    """Exact file contents, formatted like save_topic_words in the generator."""
+    return json.dumps([rec for _, rec in entries], ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def save_corpus(corpus: Corpus, word_dir: str):
+    os.makedirs(word_dir, exist_ok=True)
+    for topic_id, (fname, entries) in sorted(corpus.items()):
+        path = os.path.join(word_dir, fname)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(serialize_topic(entries))
+        os.replace(tmp_path, path)
+
+
+def topic_digest(entries: List[Tuple[str, Dict[str, Any]]]) -> str:
+    # Digest of the written bytes, so field order and formatting are covered too
+    return hashlib.sha256(serialize_topic(entries)).hexdigest()
+
+
+def corpus_digest(corpus: Corpus) -> str:
+    h = hashlib.sha256()
+    for topic_id in sorted(corpus):
+        fname, entries = corpus[topic_id]
+        h.update(f"{topic_id}\0{fname}\0{topic_digest(entries)}\n".encode("utf-8"))
+    return h.hexdigest()
+
+
+def read_pack(path: str) -> Dict[str, Any]:
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        pack = json.load(f)
+    if pack.get("format") != FORMAT_NAME:
+        raise ValueError(f"Not a {FORMAT_NAME} pack: {path}")
+    if pack.get("version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported delta pack version {pack.get('version')} (expected {FORMAT_VERSION})")
+    return pack
+
+
+def write_pack(pack: Dict[str, Any], path: str):
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "wt", encoding="utf-8") as f:
+        json.dump(pack, f, ensure_ascii=False, separators=(",", ":"))
+
+
+# ---------------- Diff ----------------
+def _diff_record(old: Dict[str, Any], new: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    changed = {k: v for k, v in new.items() if k not in old or old[k] != v}
+    removed = [k for k in old if k not in new]
+    if not changed and not removed:
+        return None
+    update: Dict[str, Any] = {}
+    if changed:
+        update["set"] = changed
+    if removed:
+        update["unset"] = removed
+    return update
+
+
+def _updated_fields(old: Dict[str, Any], upd: Optional[Dict[str, Any]]) -> List[str]:
+    """Field order apply() gets from an in-place update: kept fields stay, new ones go last."""
+    if upd is None:
+        return list(old)
+    unset = set(upd.get("unset", []))
+    fields = [k for k in old if k not in unset]
+    return fields + [k for k in upd.get("set", {}) if k not in old]
+
+
+def _reorder_fields(fields: List[str], field_order: Optional[List[str]]) -> List[str]:
+    if not field_order:
+        return fields
+    present = set(fields)
+    listed = set(field_order)
+    return [k for k in field_order if k in present] + [k for k in fields if k not in listed]
+
+
+def _natural_order(base_keys: List[str], deletes: set, added_keys: List[str]) -> List[str]:
+    return [k for k in base_keys if k not in deletes] + added_keys
+
+
+def diff_topic(base: Optional[Tuple[str, List[Tuple[str, Dict[str, Any]]]]],
+               target: Tuple[str, List[Tuple[str, Dict[str, Any]]]]) -> Optional[Dict[str, Any]]:
+    target_file, target_entries = target
+    base_file, base_entries = base if base is not None else (target_file, [])
+    if base is not None and base_file == target_file and topic_digest(base_entries) == topic_digest(target_entries):
+        return None
+
+    base_map = dict(base_entries)
+    target_map = dict(target_entries)
+    adds = [rec for key, rec in target_entries if key not in base_map]
+    deletes = [key for key, _ in base_entries if key not in target_map]
+    kept = [(key, rec, _diff_record(base_map[key], rec)) for key, rec in target_entries if key in base_map]
+    # One topic-wide field order covers the common case (e.g. a field added to every record)
+    field_order = next((list(rec) for key, rec, upd in kept
+                        if _updated_fields(base_map[key], upd) != list(rec)), None)
+    updates = []
+    for key, rec, upd in kept:
+        fields = _reorder_fields(_updated_fields(base_map[key], upd), field_order)
+        if fields != list(rec):
+            upd = dict(upd or {}, fields=list(rec))
+        if upd is not None:
+            updates.append(dict({"en": key}, **upd))
+
+    entry: Dict[str, Any] = {"file": target_file, "digest": topic_digest(target_entries)}
+    if adds:
+        entry["adds"] = adds
+    if updates:
+        entry["updates"] = updates
+    if deletes:
+        entry["deletes"] = deletes
+    target_keys = [k for k, _ in target_entries]
+    added_keys = [record_key(rec) for rec in adds]
+    if _natural_order([k for k, _ in base_entries], set(deletes), added_keys) != target_keys:
+        entry["order"] = target_keys
+    if field_order:
+        entry["field_order"] = field_order
+    return entry
+
+
+def diff_corpus(base: Corpus, target: Corpus,
+                from_version: str = "", to_version: str = "") -> Dict[str, Any]:
+    base_digest = corpus_digest(base)
+    target_digest = corpus_digest(target)
+    topics: Dict[str, Any] = {}
+    for topic_id in sorted(set(base) | set(target)):
+        if topic_id not in target:
+            topics[topic_id] = None
+            continue
+        entry = diff_topic(base.get(topic_id), target[topic_id])
+        if entry is not None:
+            topics[topic_id] = entry
+    return {
+        "format": FORMAT_NAME,
+        "version": FORMAT_VERSION,
+        "from": {"version": from_version or base_digest[:12], "digest": base_digest},
+        "to": {"version": to_version or target_digest[:12], "digest": target_digest},
+        "topics": topics,
+    }
+
+
+# ---------------- Apply & verify ----------------
+def apply_pack(base: Corpus, pack: Dict[str, Any], check_base: bool = True) -> Corpus:
+    if check_base and corpus_digest(base) != pack["from"]["digest"]:
+        raise ValueError(f"Base corpus does not match delta pack source version {pack['from']['version']}")
+
+    result: Corpus = dict(base)
+    for topic_id, entry in pack["topics"].items():
+        if entry is None:
+            result.pop(topic_id, None)
+            continue
+        _, base_entries = base.get(topic_id, (entry["file"], []))
+        records = {key: dict(rec) for key, rec in base_entries}
+        for key in entry.get("deletes", []):
+            records.pop(key, None)
+        explicit_fields: Dict[str, List[str]] = {}
+        for upd in entry.get("updates", []):
+            rec = records[upd["en"]]
+            for field in upd.get("unset", []):
+                rec.pop(field, None)
+            rec.update(upd.get("set", {}))
+            if "fields" in upd:
+                explicit_fields[upd["en"]] = upd["fields"]
+        # Rebuild kept records in target field order (adds already carry theirs)
+        field_order = entry.get("field_order")
+        for key, rec in records.items():
+            fields = explicit_fields.get(key) or _reorder_fields(list(rec), field_order)
+            if fields != list(rec):
+                records[key] = {k: rec[k] for k in fields}
+        added_keys = []
+        for rec in entry.get("adds", []):
+            key = record_key(rec)
+            records[key] = rec
+            added_keys.append(key)
+
+        order = entry.get("order") or _natural_order(
+            [k for k, _ in base_entries], set(entry.get("deletes", [])), added_keys)
+        result[topic_id] = (entry["file"], [(key, records[key]) for key in order])
+    return result
+
+
+def verify_pack(base: Corpus, pack: Dict[str, Any]) -> List[str]:
+    """Apply the pack in memory and return a list of problems (empty = OK)."""
+    problems: List[str] = []
+    try:
+        result = apply_pack(base, pack)
+    except (KeyError, ValueError) as e:
+        return [f"apply failed: {e}"]
+    for topic_id, entry in pack["topics"].items():
+        if entry is None:
+            continue
+        if topic_digest(result[topic_id][1]) != entry["digest"]:
+            problems.append(f"topic {topic_id}: digest mismatch")
+    if corpus_digest(result) != pack["to"]["digest"]:
+        problems.append("corpus digest mismatch")
+    return problems
+
+
+def summarize(pack: Dict[str, Any]) -> Dict[str, int]:
+    counts = {"topics": 0, "topics_removed": 0, "adds": 0, "updates": 0, "deletes": 0}
+    for entry in pack["topics"].values():
+        if entry is None:
+            counts["topics_removed"] += 1
+            continue
+        counts["topics"] += 1
+        for k in ("adds", "updates", "deletes"):
+            counts[k] += len(entry.get(k, []))
+    return counts
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Diff / apply / verify record-level delta packs for assets/data/word.")
+    p.add_argument("command", choices=["diff", "apply", "verify"])
+    p.add_argument("--base", required=True, help="Directory of the old corpus version.")
+    p.add_argument("--target", default="assets/data/word", help="Directory of the new corpus version (diff).")
+    p.add_argument("--pack", default="word_delta.json.gz", help="Delta pack path (.json or .json.gz).")
+    p.add_argument("--out", default="", help="diff: pack path to write; apply: output directory.")
+    p.add_argument("--from-version", default="", help="Version label of the base corpus.")
+    p.add_argument("--to-version", default="", help="Version label of the target corpus.")
+    return p.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    base = load_corpus(args.base)
+
+    if args.command == "diff":
+        try:
+            target = load_corpus(args.target, strict=True)
+        except ValueError as e:
+            raise SystemExit(f"❌ {e}")
+        pack = diff_corpus(base, target, args.from_version, args.to_version)
+        out = args.out or args.pack
+        write_pack(pack, out)
+        c = summarize(pack)
+        print(f"📦 {pack['from']['version']} → {pack['to']['version']}: {c['topics']} topics changed, "
+              f"{c['topics_removed']} removed | +{c['adds']} ~{c['updates']} -{c['deletes']} records")
+        print(f"💾 Saved: {out} ({os.path.getsize(out)} bytes)")
+    elif args.command == "apply":
+        if not args.out:
+            raise SystemExit("❌ apply needs --out <directory>")
+        pack = read_pack(args.pack)
+        result = apply_pack(base, pack)
+        save_corpus(result, args.out)
+        # Remove base files of topics that the pack dropped or renamed
+        keep = {fname for fname, _ in result.values()}
+        for fname, _ in base.values():
+            path = os.path.join(args.out, fname)
+            if fname not in keep and os.path.exists(path):
+                os.remove(path)
+        print(f"✅ Applied {pack['from']['version']} → {pack['to']['version']} into {args.out}")
+    else:
+        pack = read_pack(args.pack)
+        problems = verify_pack(base, pack)
+        if problems:
+            for msg in problems:
+                print(f"❌ {msg}")
+            raise SystemExit(1)
+        print(f"✅ Pack verified: {pack['from']['version']} → {pack['to']['version']}")
@@ -11,6 +11,14 @@ Input:
 Output:
   - One JSON file per topic: assets/data/word/{index}_{topic_id}.json
 
+Optional:
+  - --canonical-map: near-duplicate map from md/dedupe_word_ex.py; variants are
+    rewritten to their canonical form (and re-deduped) before any prompting.
+  - --id-registry: word ID registry from md/word_ids.py (default:
+    md/word_id_registry.json); every saved record gets a stable numeric 'id'
+    that survives regenerations. Pass --id-registry "" to disable; saving then
+    fails if the records or the existing topic file already carry IDs.
+
 Uses the same Dashscope (Qwen) API style as gpt5.py with retries/backoff and
 robust output parsing. Produces items compatible with lib/model/word.dart (dWord).
 
@@ -31,6 +39,49 @@ from typing import List, Dict, Any, Tuple, Optional
 
 import requests
 
+from word_ids import WordIdRegistry
+
+
+def list_word_ex_files(word_ex_dir: str) -> List[str]:
+    """Topic word lists in word_ex_dir; plain IO, usable without a generator (API key, session)."""
+    if not os.path.isdir(word_ex_dir):
+        return []
+    all_txt = [os.path.join(word_ex_dir, f)
+               for f in os.listdir(word_ex_dir)
+               if f.lower().endswith(".txt")]
+    # sort by numeric prefix if present
+    def sort_key(p: str) -> Tuple[int, str]:
+        name = os.path.basename(p)
+        m = re.match(r"^(\d+)_", name)
+        if m:
+            return (int(m.group(1)), name)
+        return (9999, name)
+    return sorted(all_txt, key=sort_key)
+
+
+def read_word_list(path: str) -> List[str]:
+    try:
+        text = open(path, "r", encoding="utf-8").read().strip()
+    except Exception:
+        return []
+    # Accept comma-separated; also tolerate newlines/semicolons
+    tokens = re.split(r"[,\n;]+", text)
+    items, seen = [], set()
+    for tok in tokens:
+        t = tok.strip()
+        if not t:
+            continue
+        key = t.lower()
+        if key in seen:
+            continue
+        seen.add(key)
+        items.append(t)
+    return items
+
+
+class GenerationFallbackError(RuntimeError):
+    """Raised instead of returning empty stubs when raise_on_fallback is set."""
+
 
 class WordsFromWordExGenerator:
     def __init__(self,
@@ -46,7 +97,11 @@ class WordsFromWordExGenerator:
                  attempts: int = 3,
                  backoff_sec: int = 2,
                  min_items: int = 20,
-                 max_items: int = 60):
+                 max_items: int = 60,
+                 canonical_map_file: Optional[str] = None,
+                 api_key: Optional[str] = None,
+                 id_registry_file: Optional[str] = None,
+                 raise_on_fallback: bool = False):
         self.topics_file = topics_file
         self.word_ex_dir = word_ex_dir
         self.output_dir = output_dir
@@ -60,9 +115,20 @@ class WordsFromWordExGenerator:
         self.backoff_sec = backoff_sec
         self.min_items = min_items
         self.max_items = max_items
-
-        # NOTE: mirrors gpt5.py pattern; replace with env var if desired
-        api_key = "sk-eb4af1767ee447118eac1df88c0478ff"
+        # {variant_lowercase: canonical_form} produced by dedupe_word_ex.py
+        self.canonical_map: Dict[str, str] = {}
+        if canonical_map_file:
+            with open(canonical_map_file, "r", encoding="utf-8") as f:
+                self.canonical_map = {k.lower(): v for k, v in json.load(f).items()}
+        # Stable numeric IDs embedded in every saved record (see word_ids.py)
+        self.id_registry: Optional[WordIdRegistry] = (
+            WordIdRegistry(id_registry_file) if id_registry_file else None)
+        # Queue workers must not commit stubs (e.g. bad or over-quota key): raise instead
+        self.raise_on_fallback = raise_on_fallback
+
+        # NOTE: mirrors gpt5.py pattern; replace with env var if desired.
+        # Callers such as queue workers may pass their own key instead.
+        api_key = api_key or "sk-eb4af1767ee447118eac1df88c0478ff"
         # api_key = os.getenv("DASHSCOPE_API_KEY", "").strip()
         if not api_key:
             raise RuntimeError("Missing DASHSCOPE_API_KEY.")
@@ -70,6 +136,9 @@ class WordsFromWordExGenerator:
             "Content-Type": "application/json",
             "Authorization": f"Bearer {api_key}",
         }
+        # Reuse one HTTP session so keep-alive connections survive across calls
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
 
         os.makedirs(self.output_dir, exist_ok=True)
 
@@ -79,47 +148,56 @@ class WordsFromWordExGenerator:
             return json.load(f)
 
     def list_word_ex_files(self) -> List[str]:
-        if not os.path.isdir(self.word_ex_dir):
-            return []
-        all_txt = [os.path.join(self.word_ex_dir, f)
-                   for f in os.listdir(self.word_ex_dir)
-                   if f.lower().endswith(".txt")]
-        # sort by numeric prefix if present
-        def sort_key(p: str) -> Tuple[int, str]:
-            name = os.path.basename(p)
-            m = re.match(r"^(\d+)_", name)
-            if m:
-                return (int(m.group(1)), name)
-            return (9999, name)
-        return sorted(all_txt, key=sort_key)
+        return list_word_ex_files(self.word_ex_dir)
 
     def read_word_list(self, path: str) -> List[str]:
-        try:
-            text = open(path, "r", encoding="utf-8").read().strip()
-        except Exception:
-            return []
-        # Accept comma-separated; also tolerate newlines/semicolons
-        tokens = re.split(r"[,\n;]+", text)
-        items, seen = [], set()
-        for tok in tokens:
-            t = tok.strip()
-            if not t:
-                continue
+        return read_word_list(path)
+
+    def apply_canonical_map(self, items: List[str]) -> List[str]:
+        if not self.canonical_map:
+            return items
+        result, seen = [], set()
+        for it in items:
+            t = self.canonical_map.get(it.lower(), it)
             key = t.lower()
             if key in seen:
                 continue
             seen.add(key)
-            items.append(t)
-        return items
+            result.append(t)
+        return result
 
     def save_topic_words(self, index: int, topic_id: str, items: List[Dict[str, Any]]) -> int:
         filename = f"{index:02d}_{topic_id}.json"
         path = os.path.join(self.output_dir, filename)
-        with open(path, "w", encoding="utf-8") as f:
+        if self.id_registry is not None:
+            # Reload first: queue workers in other processes may have allocated IDs
+            self.id_registry.load()
+            items, _ = self.id_registry.assign_items(topic_id, items)
+            self.id_registry.save()
+        elif self._has_word_ids(items) or self._has_word_ids(self._load_saved(path)):
+            # Saving would drop IDs (or mix records with and without them)
+            raise RuntimeError(f"{filename} carries word IDs but no --id-registry was given.")
+        # write to a temp file then rename, so readers never see a half-written topic
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
             json.dump(items, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
         print(f"💾 Saved: {filename} → {len(items)} items")
         return len(items)
 
+    @staticmethod
+    def _load_saved(path: str) -> List[Dict[str, Any]]:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception:
+            return []
+        return data if isinstance(data, list) else []
+
+    @staticmethod
+    def _has_word_ids(items: List[Dict[str, Any]]) -> bool:
+        return any(isinstance(it, dict) and it.get("id") is not None for it in items)
+
     # ---------------- Prompt & API ----------------
     def build_prompt(self, topic: Dict[str, Any], provided_list: List[str]) -> List[Dict[str, str]]:
         topic_name = topic.get("name", "")
@@ -171,9 +249,8 @@ class WordsFromWordExGenerator:
             "top_p": self.top_p,
             "stream": False,
         }
-        resp = requests.post(
+        resp = self.session.post(
             self.base_url,
-            headers=self.headers,
             json=payload,
             timeout=self.timeout_sec,
         )
@@ -396,7 +473,8 @@ class WordsFromWordExGenerator:
                             # ensure within min/max
                             if len(normalized) >= max(1, min(self.min_items, len(trimmed))):
                                 # Enrich missing fields before returning
-                                return self._enrich_items(topic, normalized[: self.max_items])
+                                return self._check_complete(
+                                    topic, self._enrich_items(topic, normalized[: self.max_items]))
                     except Exception as e:
                         # parsing failed, will retry
                         pass
@@ -404,6 +482,9 @@ class WordsFromWordExGenerator:
                 print(f"⚠️ Exception on attempt {attempt}: {e}")
             time.sleep(self.backoff_sec * attempt)
 
+        if self.raise_on_fallback:
+            raise GenerationFallbackError(f"No valid JSON array for topic {topic.get('id')} "
+                                          f"after {self.attempts} attempts")
         print("❌ Failed to get valid JSON array; returning minimal stubs")
         # Fallback: create minimal stubs with only required fields
         topic_id = topic.get("id", "")
@@ -423,28 +504,33 @@ class WordsFromWordExGenerator:
         # Enrich stubs to fill missing fields
         return self._enrich_items(topic, stubs)
 
+    @staticmethod
+    def is_incomplete_item(item: Dict[str, Any]) -> bool:
+        """True for stub-like records (enrichment failed): no meaning or example."""
+        return not str(item.get("vi") or "").strip() or not str(item.get("sentence") or "").strip()
+
+    def _check_complete(self, topic: Dict[str, Any], items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        incomplete = [it.get("en") for it in items if self.is_incomplete_item(it)]
+        if incomplete and self.raise_on_fallback:
+            raise GenerationFallbackError(f"{len(incomplete)} items of topic {topic.get('id')} "
+                                          f"left without vi/sentence, e.g. {incomplete[:3]}")
+        return items
+
     # ---------------- Main ----------------
-    def run(self, only_topics: Optional[List[str]] = None):
+    def resolve_topic_files(self, only_topics: Optional[List[str]] = None) -> List[Tuple[str, int, Dict[str, Any]]]:
+        """Map word_ex files to (path, index, topic), skipping unknown/filtered ones."""
         topics = self.load_topics()
         # map topic_id -> (index, topic)
         id_to_index_topic: Dict[str, Tuple[int, Dict[str, Any]]] = {}
         for i, t in enumerate(topics, 1):
             id_to_index_topic[t.get("id")] = (i, t)
 
-        files = self.list_word_ex_files()
-        if not files:
-            print("❌ No topic files found in word_ex directory.")
-            return
-
-        print(f"🔎 Found {len(files)} topic files in {self.word_ex_dir}")
-
-        for path in files:
+        resolved: List[Tuple[str, int, Dict[str, Any]]] = []
+        for path in self.list_word_ex_files():
             fname = os.path.basename(path)
             m = re.match(r"^(\d+)_([\w\-]+)\.txt$", fname)
-            idx_by_name: Optional[int] = None
             topic_id_from_file: Optional[str] = None
             if m:
-                idx_by_name = int(m.group(1))
                 topic_id_from_file = m.group(2)
             else:
                 # accept names like topic_id.txt
@@ -464,15 +550,29 @@ class WordsFromWordExGenerator:
                 continue
 
             index, topic = id_to_index_topic[topic_id_from_file]
-            word_list = self.read_word_list(path)
+            resolved.append((path, index, topic))
+        return resolved
+
+    def run(self, only_topics: Optional[List[str]] = None):
+        files = self.list_word_ex_files()
+        if not files:
+            print("❌ No topic files found in word_ex directory.")
+            return
+
+        print(f"🔎 Found {len(files)} topic files in {self.word_ex_dir}")
+
+        for path, index, topic in self.resolve_topic_files(only_topics):
+            fname = os.path.basename(path)
+            topic_id = topic.get("id", "")
+            word_list = self.apply_canonical_map(self.read_word_list(path))
             if not word_list:
                 print(f"⚠️  Empty list in {fname} → producing empty JSON")
-                self.save_topic_words(index, topic_id_from_file, [])
+                self.save_topic_words(index, topic_id, [])
                 continue
 
-            print(f"\n🔷 [{index:02d}] Generating words for: {topic.get('name')} (ID: {topic_id_from_file})")
+            print(f"\n🔷 [{index:02d}] Generating words for: {topic.get('name')} (ID: {topic_id})")
             items = self.generate_topic_words(index, topic, word_list)
-            self.save_topic_words(index, topic_id_from_file, items)
+            self.save_topic_words(index, topic_id, items)
 
 
 def parse_args():
@@ -485,6 +585,9 @@ def parse_args():
     p.add_argument("--min-items", type=int, default=20)
     p.add_argument("--max-items", type=int, default=60)
     p.add_argument("--only-topics", default="", help="Comma-separated topic ids to process only")
+    p.add_argument("--canonical-map", default="", help="JSON map from dedupe_word_ex.py applied before prompting")
+    p.add_argument("--id-registry", default="md/word_id_registry.json",
+                   help="Word ID registry (word_ids.py); embeds stable 'id' fields (\"\" to disable)")
     return p.parse_args()
 
 
@@ -500,6 +603,8 @@ if __name__ == "__main__":
         backoff_sec=args.backoff,
         min_items=args.min_items,
         max_items=args.max_items,
+        canonical_map_file=args.canonical_map or None,
+        id_registry_file=args.id_registry or None,
     )
     print(f"🔧 attempts={args.attempts} | backoff={args.backoff}s | range={args.min_items}-{args.max_items}")
     print(f"📁 topics={args.topics_file} | word_ex={args.word_ex_dir} | out={args.output_dir}")
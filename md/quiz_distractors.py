@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Precompute quiz distractors (wrong answers) for every word in assets/data/word.
+
+For each word, candidates come from the same topic with the same `type` and
+`level` (relaxed to the whole topic when too few remain). They are ranked by
+how plausible they look:
+  - similar spelling of `en` (cosine of hashed character 3-gram vectors),
+  - similar spelling of `vi`, rewarded only up to --vi-cap and penalized above
+    it (close meanings are near-synonyms rather than good distractors),
+  - similar `difficulty`,
+and excluded when they would be a second correct answer: listed synonym, same
+normalized `vi`, one `vi` containing the other, or `vi` nearly identical. The
+same test runs between the picks, so one quiz never shows two options with
+the same meaning ("goodbye" / "bye").
+
+All scoring is done per topic on NumPy matrices, so the whole corpus takes a
+fraction of a second. The result is a compact index keyed by word `id`
+(see word_ids.py), so quiz generation on the device is an O(1) lookup:
+
+  {"version": 1, "k": 5, "distractors": {"<word id>": [id, id, ...], ...}}
+
+CLI example (from project root):
+  python md/quiz_distractors.py \
+    --word-dir assets/data/word \
+    --out assets/data/quiz_distractors.json --k 5
+"""
+
+import os
+import re
+import json
+import zlib
+import argparse
+import unicodedata
+from typing import List, Dict, Any
+
+import numpy as np
+
+
+INDEX_VERSION = 1
+
+
+class DistractorBuilder:
+    def __init__(self,
+                 word_dir: str = "assets/data/word",
+                 k: int = 5,
+                 dims: int = 1024,
+                 en_weight: float = 0.5,
+                 vi_weight: float = 0.3,
+                 difficulty_weight: float = 0.2,
+                 synonym_vi_threshold: float = 0.85,
+                 vi_cap: float = 0.3):
+        self.word_dir = word_dir
+        self.k = k
+        self.dims = dims
+        self.en_weight = en_weight
+        self.vi_weight = vi_weight
+        self.difficulty_weight = difficulty_weight
+        self.synonym_vi_threshold = synonym_vi_threshold
+        self.vi_cap = vi_cap
+
+    # ---------------- IO ----------------
+    def load_topics(self) -> Dict[str, List[Dict[str, Any]]]:
+        topics: Dict[str, List[Dict[str, Any]]] = {}
+        for fname in sorted(os.listdir(self.word_dir)):
+            if not fname.endswith(".json"):
+                continue
+            with open(os.path.join(self.word_dir, fname), "r", encoding="utf-8") as f:
+                items = [it for it in json.load(f) if isinstance(it, dict)]
+            missing = [it.get("en") for it in items if it.get("id") is None]
+            if missing:
+                raise ValueError(f"{fname}: {len(missing)} records without 'id' "
+                                 f"(run md/word_ids.py assign first), e.g. {missing[:3]}")
+            topics[fname] = items
+        return topics
+
+    # ---------------- Features ----------------
+    @staticmethod
+    def normalize(text: str) -> str:
+        t = unicodedata.normalize("NFC", str(text or "")).replace("’", "'").casefold()
+        t = re.sub(r"[^\w\s']", " ", t)
+        return re.sub(r"\s+", " ", t).strip()
+
+    def char_ngram_matrix(self, texts: List[str], n: int = 3) -> np.ndarray:
+        """L2-normalized hashed character n-gram counts, one row per text."""
+        rows: List[int] = []
+        cols: List[int] = []
+        for r, text in enumerate(texts):
+            padded = f" {text} "
+            for i in range(max(len(padded) - n + 1, 1)):
+                rows.append(r)
+                cols.append(zlib.crc32(padded[i:i + n].encode("utf-8")) % self.dims)
+        mat = np.zeros((len(texts), self.dims), dtype=np.float32)
+        np.add.at(mat, (np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64)), 1.0)
+        norms = np.linalg.norm(mat, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return mat / norms
+
+    # ---------------- Ranking ----------------
+    def rank_topic(self, items: List[Dict[str, Any]]) -> Dict[int, List[int]]:
+        n = len(items)
+        if n < 2:
+            return {int(it["id"]): [] for it in items}
+
+        en = [self.normalize(it.get("en", "")) for it in items]
+        vi = [self.normalize(it.get("vi", "")) for it in items]
+        en_mat = self.char_ngram_matrix(en)
+        vi_mat = self.char_ngram_matrix(vi)
+        sim_en = en_mat @ en_mat.T
+        sim_vi = vi_mat @ vi_mat.T
+
+        difficulty = np.array([int(it.get("difficulty", 1) or 1) for it in items], dtype=np.float32)
+        diff_gap = np.abs(difficulty[:, None] - difficulty[None, :]) / 4.0
+
+        types = np.array([str(it.get("type", "")) for it in items])
+        levels = np.array([str(it.get("level", "")) for it in items])
+        same_kind = (types[:, None] == types[None, :]) & (levels[:, None] == levels[None, :])
+
+        # Candidates that would also be a correct answer
+        vi_arr = np.array(vi)
+        excluded = np.eye(n, dtype=bool)
+        excluded |= (vi_arr[:, None] == vi_arr[None, :]) & (vi_arr[:, None] != "")
+        excluded |= sim_vi >= self.synonym_vi_threshold
+        # One meaning contained in the other ("ví dụ" / "ví dụ như") is also a synonym
+        padded_vi = np.array([f" {v} " for v in vi])
+        contains = np.char.find(padded_vi[None, :], padded_vi[:, None]) >= 0
+        nonempty = vi_arr != ""
+        excluded |= (contains | contains.T) & nonempty[:, None] & nonempty[None, :]
+        en_index = {e: i for i, e in enumerate(en)}
+        for i, it in enumerate(items):
+            for syn in it.get("synonyms") or []:
+                j = en_index.get(self.normalize(syn))
+                if j is not None:
+                    excluded[i, j] = excluded[j, i] = True
+        excluded |= (np.array(en)[:, None] == np.array(en)[None, :])
+
+        # Bonus rises with vi similarity up to vi_cap, then falls off
+        vi_bonus = np.minimum(sim_vi, self.vi_cap) - np.maximum(sim_vi - self.vi_cap, 0.0)
+        score = (self.en_weight * sim_en + self.vi_weight * vi_bonus
+                 - self.difficulty_weight * diff_gap)
+        # Same type/level first; other words of the topic only fill remaining slots
+        score = np.where(same_kind, score + 10.0, score)
+        score = np.where(excluded, -np.inf, score)
+
+        ranked = np.argsort(-score, axis=1, kind="stable")
+        ids = np.array([int(it["id"]) for it in items])
+        result: Dict[int, List[int]] = {}
+        for i in range(n):
+            # Greedy: skip candidates that mean the same as an option already picked
+            picks: List[int] = []
+            for j in ranked[i]:
+                if len(picks) == self.k or not np.isfinite(score[i, j]):
+                    break
+                if not excluded[j, picks].any():
+                    picks.append(j)
+            result[int(ids[i])] = ids[picks].tolist()
+        return result
+
+    # ---------------- Main ----------------
+    def build(self) -> Dict[str, Any]:
+        distractors: Dict[str, List[int]] = {}
+        short = 0
+        for fname, items in self.load_topics().items():
+            for word_id, picks in self.rank_topic(items).items():
+                distractors[str(word_id)] = picks
+                if len(picks) < self.k:
+                    short += 1
+        if short:
+            print(f"⚠️  {short} words have fewer than {self.k} distractors (small topics or many synonyms)")
+        return {"version": INDEX_VERSION, "k": self.k, "distractors": distractors}
+
+    def run(self, out_path: str) -> Dict[str, Any]:
+        index = self.build()
+        tmp_path = out_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(index, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, out_path)
+        print(f"💾 Saved: {out_path} → {len(index['distractors'])} words "
+              f"({os.path.getsize(out_path)} bytes)")
+        return index
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Precompute ranked quiz distractors for the generated corpus.")
+    p.add_argument("--word-dir", default="assets/data/word")
+    # Not inside word/: every JSON there is loaded as a topic word list by the app
+    p.add_argument("--out", default="assets/data/quiz_distractors.json")
+    p.add_argument("--k", type=int, default=5, help="Distractors per word (default: 5).")
+    p.add_argument("--synonym-vi-threshold", type=float, default=0.85,
+                   help="vi similarity above which a candidate counts as a synonym (default: 0.85).")
+    p.add_argument("--vi-cap", type=float, default=0.3,
+                   help="vi similarity up to which a candidate gains plausibility; above it, it loses (default: 0.3).")
+    return p.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    builder = DistractorBuilder(
+        word_dir=args.word_dir,
+        k=args.k,
+        synonym_vi_threshold=args.synonym_vi_threshold,
+        vi_cap=args.vi_cap,
+    )
+    builder.run(args.out)
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Vectorized spaced-repetition workload simulator for the generated corpus.
+
+Loads every record of assets/data/word (difficulty, easeFactor, currentInterval)
+and simulates many synthetic learners studying it day by day with SM-2 style
+scheduling. State is kept in (learners x words) NumPy arrays and every day is
+a handful of array operations — no per-word Python loops. Since words are
+introduced in corpus order, each day only touches the columns introduced so far.
+
+Model (one step = one day, per learner):
+  - studies on a given day with probability --study-prob;
+  - introduces up to --new-per-day unseen words in corpus order
+    (StudySchedulerConfig.newWordsCap in lib/service/study_scheduler.dart);
+  - reviews all due words (or the --review-cap most overdue ones);
+  - recall probability decays with the time since the last review relative to
+    the scheduled interval, and drops for harder words and weaker learners;
+  - grades 0-5 update easeFactor / interval / repetitions with SM-2;
+  - notifications are driven by due events: only words that become due on a
+    day (first-due transitions, not the carried-over backlog) ask for a
+    reminder, one per --words-per-notification such words, and at most
+    --max-notifications are sent per day (the reminder services schedule at
+    most three daily slots). Both the uncapped demand and the capped count
+    are reported, plus how often the cap is hit.
+
+Reports per-day review volume, notification demand vs. sent reminders, and —
+when several --ease / --interval values are given — how the defaults change them.
+
+CLI example (from project root):
+  python md/srs_simulator.py --word-dir assets/data/word \
+    --learners 500 --days 180 --ease 2.3,2.5,2.7 --interval 1,2 \
+    --report srs_report.json
+"""
+
+import os
+import json
+import time
+import argparse
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+
+class SrsWorkloadSimulator:
+    def __init__(self,
+                 word_dir: str = "assets/data/word",
+                 learners: int = 200,
+                 days: int = 180,
+                 new_per_day: int = 6,
+                 review_cap: int = 0,
+                 study_prob: float = 0.85,
+                 words_per_notification: int = 5,
+                 max_notifications: int = 3,
+                 seed: int = 7):
+        self.word_dir = word_dir
+        self.learners = learners
+        self.days = days
+        self.new_per_day = new_per_day
+        self.review_cap = review_cap
+        self.study_prob = study_prob
+        self.words_per_notification = words_per_notification
+        self.max_notifications = max_notifications
+        self.seed = seed
+
+        self.difficulty: np.ndarray = np.zeros(0, dtype=np.float32)
+        self.corpus_ease: np.ndarray = np.zeros(0, dtype=np.float32)
+        self.corpus_interval: np.ndarray = np.zeros(0, dtype=np.float32)
+
+    # ---------------- IO ----------------
+    def load_corpus(self) -> int:
+        difficulty: List[float] = []
+        ease: List[float] = []
+        interval: List[float] = []
+        for fname in sorted(os.listdir(self.word_dir)):
+            if not fname.endswith(".json"):
+                continue
+            with open(os.path.join(self.word_dir, fname), "r", encoding="utf-8") as f:
+                for it in json.load(f):
+                    if not isinstance(it, dict):
+                        continue
+                    difficulty.append(float(it.get("difficulty") or 1))
+                    ease.append(float(it.get("easeFactor") or 2.5))
+                    interval.append(float(it.get("currentInterval") or 1))
+        self.difficulty = np.clip(np.array(difficulty, dtype=np.float32), 1, 5)
+        self.corpus_ease = np.array(ease, dtype=np.float32)
+        self.corpus_interval = np.maximum(np.array(interval, dtype=np.float32), 1)
+        return len(difficulty)
+
+    # ---------------- Simulation ----------------
+    def simulate(self, ease: Optional[float] = None, interval: Optional[float] = None) -> Dict[str, Any]:
+        """Run one scenario. ease/interval override the corpus defaults when given."""
+        rng = np.random.default_rng(self.seed)
+        L, W, D = self.learners, len(self.difficulty), self.days
+
+        init_ease = np.full(W, ease, dtype=np.float32) if ease is not None else self.corpus_ease
+        init_interval = (np.full(W, interval, dtype=np.float32) if interval is not None
+                         else self.corpus_interval)
+
+        ef = np.broadcast_to(init_ease, (L, W)).copy()
+        ivl = np.broadcast_to(init_interval, (L, W)).copy()
+        reps = np.zeros((L, W), dtype=np.int16)
+        due = np.full((L, W), np.iinfo(np.int32).max, dtype=np.int32)
+        last = np.zeros((L, W), dtype=np.int32)
+        introduced = np.zeros(L, dtype=np.int32)  # words are introduced in corpus order
+
+        # Learner ability shifts recall probability; harder words lower it
+        skill = rng.normal(0.0, 0.05, size=(L, 1)).astype(np.float32)
+        word_penalty = ((self.difficulty - 1) * 0.03)[None, :]
+        rows = np.arange(L)[:, None]
+
+        reviews = np.zeros((D, L), dtype=np.int32)
+        due_counts = np.zeros((D, L), dtype=np.int32)
+        newly_due = np.zeros((D, L), dtype=np.int32)
+        new_counts = np.zeros((D, L), dtype=np.int32)
+        lapses = np.zeros(D, dtype=np.int64)
+
+        for day in range(D):
+            studies = rng.random(L) < self.study_prob
+            # Words are introduced in corpus order, so only the first A columns can be due
+            A = int(introduced.max())
+            is_due = due[:, :A] <= day
+            due_counts[day] = is_due.sum(axis=1)
+            newly_due[day] = (due[:, :A] == day).sum(axis=1)
+
+            # Select today's reviews (all due, or the most overdue up to the cap)
+            review = is_due & studies[:, None]
+            if self.review_cap and 0 < self.review_cap < A:
+                overdue = np.where(review, day - due[:, :A], -1)
+                top = np.argpartition(-overdue, self.review_cap - 1, axis=1)[:, :self.review_cap]
+                capped = np.zeros_like(review)
+                capped[rows, top] = True
+                review &= capped
+            reviews[day] = review.sum(axis=1)
+
+            if review.any():
+                a_ef, a_ivl, a_reps = ef[:, :A], ivl[:, :A], reps[:, :A]
+                elapsed = (day - last[:, :A]).astype(np.float32)
+                retention = np.power(0.9, elapsed / np.maximum(a_ivl, 1.0))
+                p_recall = np.clip(retention + skill - word_penalty[:, :A], 0.05, 0.99)
+                recalled = rng.random((L, A)) < p_recall
+                # Grades: recalled → 3..5 (easier the more retention left), failed → 0..2
+                grade = np.where(
+                    recalled,
+                    3 + (rng.random((L, A)) < p_recall).astype(np.int16)
+                      + (rng.random((L, A)) < p_recall * 0.6).astype(np.int16),
+                    rng.integers(0, 3, size=(L, A), dtype=np.int16),
+                ).astype(np.float32)
+
+                # SM-2 update, applied only where a review happened
+                q_gap = 5.0 - grade
+                new_ef = np.maximum(1.3, a_ef + (0.1 - q_gap * (0.08 + q_gap * 0.02)))
+                passed = grade >= 3
+                new_reps = np.where(passed, a_reps + 1, 0).astype(np.int16)
+                new_ivl = np.where(
+                    ~passed, 1.0,
+                    np.where(new_reps == 1, init_interval[None, :A],
+                             np.where(new_reps == 2, 6.0, np.minimum(np.round(a_ivl * new_ef), 36500.0))))
+                ef[:, :A] = np.where(review, new_ef, a_ef)
+                reps[:, :A] = np.where(review, new_reps, a_reps)
+                ivl[:, :A] = np.where(review, new_ivl, a_ivl)
+                due[:, :A] = np.where(review, day + ivl[:, :A].astype(np.int32), due[:, :A])
+                last[:, :A] = np.where(review, day, last[:, :A])
+                lapses[day] = int((review & ~passed).sum())
+
+            # Introduce new words in corpus order
+            n_new = np.where(studies, np.minimum(self.new_per_day, W - introduced), 0)
+            new_counts[day] = n_new
+            if n_new.any():
+                B = int((introduced + n_new).max())
+                col = np.arange(B)[None, :]
+                fresh = (col >= introduced[:, None]) & (col < (introduced + n_new)[:, None])
+                due[:, :B] = np.where(fresh, day + init_interval[None, :B].astype(np.int32), due[:, :B])
+                last[:, :B] = np.where(fresh, day, last[:, :B])
+                introduced += n_new
+
+        demand = np.ceil(newly_due / float(self.words_per_notification)).astype(np.int32)
+        notifications = np.minimum(self.max_notifications, demand)
+        per_day_reviews = reviews.sum(axis=1)
+        per_day_demand = demand.sum(axis=1)
+        per_day_notifications = notifications.sum(axis=1)
+        return {
+            "ease": float(ease) if ease is not None else None,
+            "interval": float(interval) if interval is not None else None,
+            "learners": L,
+            "words": W,
+            "days": D,
+            "reviews_per_day_total": per_day_reviews.tolist(),
+            "reviews_per_learner_mean": np.round(reviews.mean(axis=1), 2).tolist(),
+            "reviews_per_learner_p95": np.percentile(reviews, 95, axis=1).tolist(),
+            "new_words_per_day_total": new_counts.sum(axis=1).tolist(),
+            "lapses_per_day_total": lapses.tolist(),
+            "due_per_learner_mean": np.round(due_counts.mean(axis=1), 2).tolist(),
+            "newly_due_per_learner_mean": np.round(newly_due.mean(axis=1), 2).tolist(),
+            "notification_demand_per_day_total": per_day_demand.tolist(),
+            "notifications_per_day_total": per_day_notifications.tolist(),
+            "peak_reviews_day": int(per_day_reviews.argmax()),
+            "peak_reviews_total": int(per_day_reviews.max()),
+            "peak_reviews_per_learner": int(reviews.max()),
+            "peak_notification_demand_day": int(per_day_demand.argmax()),
+            "peak_notification_demand_total": int(per_day_demand.max()),
+            "peak_notification_demand_per_learner": int(demand.max()),
+            "peak_notifications_day": int(per_day_notifications.argmax()),
+            "peak_notifications_total": int(per_day_notifications.max()),
+            "mean_reviews_per_learner_day": round(float(reviews.mean()), 2),
+            "mean_notification_demand_per_learner_day": round(float(demand.mean()), 2),
+            "mean_notifications_per_learner_day": round(float(notifications.mean()), 2),
+            "cap_hit_share": round(float((demand > self.max_notifications).mean()), 3),
+            "words_introduced_per_learner": round(float(introduced.mean()), 1),
+        }
+
+    # ---------------- Main ----------------
+    def run(self, ease_values: List[Optional[float]], interval_values: List[Optional[float]],
+            report_path: Optional[str] = None) -> List[Dict[str, Any]]:
+        words = self.load_corpus()
+        if words == 0:
+            print("❌ No words found in word directory.")
+            return []
+        print(f"📚 {words} words | {self.learners} learners | {self.days} days | "
+              f"new/day={self.new_per_day} | review cap={self.review_cap or '∞'}")
+
+        results = []
+        for e in ease_values:
+            for i in interval_values:
+                started = time.time()
+                res = self.simulate(ease=e, interval=i)
+                res["elapsed_sec"] = round(time.time() - started, 2)
+                results.append(res)
+                label_e = "corpus" if e is None else f"{e:g}"
+                label_i = "corpus" if i is None else f"{i:g}"
+                print(f"🔷 ease={label_e} interval={label_i}: "
+                      f"{res['mean_reviews_per_learner_day']} reviews/learner/day, "
+                      f"peak {res['peak_reviews_total']} reviews (day {res['peak_reviews_day']}), "
+                      f"notifications/learner/day {res['mean_notifications_per_learner_day']} sent "
+                      f"of {res['mean_notification_demand_per_learner_day']} wanted, "
+                      f"peak {res['peak_notifications_total']} sent / "
+                      f"{res['peak_notification_demand_total']} wanted "
+                      f"(day {res['peak_notification_demand_day']}), "
+                      f"cap hit {res['cap_hit_share']:.1%} [{res['elapsed_sec']}s]")
+
+        if report_path:
+            with open(report_path, "w", encoding="utf-8") as f:
+                json.dump(results, f, ensure_ascii=False, indent=2)
+            print(f"💾 Saved: {report_path}")
+        return results
+
+
+def _parse_values(text: str) -> List[Optional[float]]:
+    values = [float(x) for x in text.split(",") if x.strip()]
+    return values or [None]
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Simulate SM-2 review and notification load for the word corpus.")
+    p.add_argument("--word-dir", default="assets/data/word")
+    p.add_argument("--learners", type=int, default=200)
+    p.add_argument("--days", type=int, default=180)
+    p.add_argument("--new-per-day", type=int, default=6, help="New words per study day (default: 6).")
+    p.add_argument("--review-cap", type=int, default=0, help="Max reviews per learner per day (0 = all due).")
+    p.add_argument("--study-prob", type=float, default=0.85, help="Probability a learner studies on a day.")
+    p.add_argument("--words-per-notification", type=int, default=5,
+                   help="Newly due words per reminder (default: 5).")
+    p.add_argument("--max-notifications", type=int, default=3, help="Reminder slots per learner per day.")
+    p.add_argument("--ease", default="", help="Comma-separated default easeFactor values (default: corpus).")
+    p.add_argument("--interval", default="", help="Comma-separated default interval values (default: corpus).")
+    p.add_argument("--seed", type=int, default=7)
+    p.add_argument("--report", default="", help="Optional path for the full JSON report.")
+    return p.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    sim = SrsWorkloadSimulator(
+        word_dir=args.word_dir,
+        learners=args.learners,
+        days=args.days,
+        new_per_day=args.new_per_day,
+        review_cap=args.review_cap,
+        study_prob=args.study_prob,
+        words_per_notification=args.words_per_notification,
+        max_notifications=args.max_notifications,
+        seed=args.seed,
+    )
+    sim.run(_parse_values(args.ease), _parse_values(args.interval), args.report or None)
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Round-trip tests for delta_pack.py: diff → write/read → apply → verify must
+reproduce the target files byte for byte, including record field order.
+
+Run (from project root):
+  python -m pytest -q md/test_delta_pack.py
+"""
+
+import os
+import json
+
+import pytest
+
+from delta_pack import (apply_pack, diff_corpus, load_corpus, read_pack,
+                        save_corpus, verify_pack, write_pack)
+
+
+def _word(en: str, vi: str, **extra):
+    rec = {"en": en, "vi": vi, "topic": "t", "difficulty": 1}
+    rec.update(extra)
+    return rec
+
+
+def _write_topics(word_dir: str, topics):
+    os.makedirs(word_dir, exist_ok=True)
+    for fname, records in topics.items():
+        with open(os.path.join(word_dir, fname), "w", encoding="utf-8") as f:
+            json.dump(records, f, ensure_ascii=False, indent=2)
+
+
+def _read_files(word_dir: str):
+    files = {}
+    for fname in sorted(os.listdir(word_dir)):
+        with open(os.path.join(word_dir, fname), "rb") as f:
+            files[fname] = f.read()
+    return files
+
+
+def _round_trip(tmp_path, base_topics, target_topics):
+    base_dir, target_dir, out_dir = (str(tmp_path / d) for d in ("base", "target", "out"))
+    _write_topics(base_dir, base_topics)
+    _write_topics(target_dir, target_topics)
+    base = load_corpus(base_dir)
+
+    pack_path = str(tmp_path / "delta.json.gz")
+    write_pack(diff_corpus(base, load_corpus(target_dir), "v1", "v2"), pack_path)
+    pack = read_pack(pack_path)
+    assert verify_pack(base, pack) == []
+
+    save_corpus(apply_pack(base, pack), out_dir)
+    assert _read_files(out_dir) == _read_files(target_dir)
+    return pack
+
+
+def test_round_trip_reproduces_target_bytes(tmp_path):
+    base = {
+        "01_greetings.json": [_word("hello", "xin chào"), _word("bye", "tạm biệt"), _word("hi", "chào")],
+        "02_food.json": [_word("apple", "táo"), _word("rice", "cơm")],
+        "03_old.json": [_word("gone", "đã mất")],
+    }
+    target = {
+        # field added first to every record (the word ID backfill case)
+        "01_greetings.json": [{"id": 1, **_word("Hello", "xin chào")},
+                              {"id": 2, **_word("hi", "chào bạn")},
+                              {"id": 3, **_word("good night", "chúc ngủ ngon")}],
+        # reordered records, one record with its own field order, a removed field
+        "02_food.json": [{"vi": "cơm", "en": "rice", "topic": "t", "difficulty": 2},
+                         {"en": "apple", "vi": "táo", "topic": "t"}],
+        "04_new.json": [_word("new", "mới")],
+    }
+    pack = _round_trip(tmp_path, base, target)
+    assert pack["topics"]["old"] is None
+    assert pack["topics"]["greetings"]["field_order"][0] == "id"
+
+
+def test_order_only_change_is_shipped(tmp_path):
+    records = [_word("one", "một"), _word("two", "hai")]
+    reordered = [{k: rec[k] for k in ("vi", "en", "topic", "difficulty")} for rec in records]
+    pack = _round_trip(tmp_path, {"01_n.json": records}, {"01_n.json": reordered})
+    assert "n" in pack["topics"]
+
+
+def test_verify_detects_tampered_pack(tmp_path):
+    base_dir, target_dir = str(tmp_path / "base"), str(tmp_path / "target")
+    _write_topics(base_dir, {"01_n.json": [_word("one", "một")]})
+    _write_topics(target_dir, {"01_n.json": [{"id": 7, **_word("one", "một")}]})
+    base = load_corpus(base_dir)
+    pack = diff_corpus(base, load_corpus(target_dir))
+
+    pack["topics"]["n"].pop("field_order")
+    problems = verify_pack(base, pack)
+    assert "topic n: digest mismatch" in problems
+
+
+def test_strict_load_rejects_records_a_pack_cannot_reproduce(tmp_path):
+    word_dir = str(tmp_path / "target")
+    _write_topics(word_dir, {"01_n.json": [{"en": "a"}, {"en": "A ", "vi": "2"}]})
+    assert len(load_corpus(word_dir)["n"][1]) == 1
+    with pytest.raises(ValueError, match="duplicate key 'a'"):
+        load_corpus(word_dir, strict=True)
+
+    _write_topics(word_dir, {"01_n.json": [{"en": "a"}, "b"]})
+    with pytest.raises(ValueError, match="record 1 is not an object"):
+        load_corpus(word_dir, strict=True)
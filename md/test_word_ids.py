@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests for word_ids.py: IDs must survive the rewrites a rebuild applies to `en`
+(casing, curly quotes, contractions from the dedupe_word_ex.py canonical map).
+
+Run (from project root):
+  python -m pytest -q md/test_word_ids.py
+"""
+
+import json
+
+import pytest
+
+from word_ids import WordIdRegistry, word_key
+
+
+def test_canonical_map_rewrites_keep_ids(tmp_path):
+    registry = WordIdRegistry(str(tmp_path / "ids.json"))
+    items, _ = registry.assign_items("t", [{"en": "I am from"}, {"en": "what is your name?"}])
+    rebuilt, new_ids = registry.assign_items("t", [{"en": "what’s your name"}, {"en": "I'm from"}])
+    assert new_ids == 0
+    assert [it["id"] for it in rebuilt] == [items[1]["id"], items[0]["id"]]
+    # Hyphens still tell words apart
+    assert word_key("t", "check-in") != word_key("t", "check in")
+
+
+def test_version_1_registry_is_rekeyed(tmp_path):
+    path = tmp_path / "ids.json"
+    path.write_text(json.dumps({"version": 1, "next_id": 3,
+                                "ids": {"t/i'm from": 1, "t/what's up?": 2}}), encoding="utf-8")
+    registry = WordIdRegistry(str(path))
+    assert registry.get_or_assign("t", "I am from") == 1
+    assert registry.get_or_assign("t", "what is up") == 2
+    registry.save()
+    assert json.loads(path.read_text(encoding="utf-8"))["version"] == 2
+
+
+def test_variants_in_one_topic_are_rejected(tmp_path):
+    registry = WordIdRegistry(str(tmp_path / "ids.json"))
+    with pytest.raises(ValueError, match="share the key"):
+        registry.assign_items("t", [{"en": "I'm from"}, {"en": "I am from"}])
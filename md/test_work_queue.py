@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests for the lease / heartbeat / exactly-once logic of work_queue.py.
+
+No network calls: generate_topic_words is replaced by a stub that echoes the
+batch (or call_api by one that fails), and topic files are written to a
+temporary output dir.
+
+Run (from project root):
+  python -m pytest -q md/test_work_queue.py
+"""
+
+import os
+import json
+import time
+import sqlite3
+from contextlib import closing
+
+import pytest
+
+from generate_words_from_word_ex import WordsFromWordExGenerator
+from work_queue import SQLiteWorkQueue, QueueWorker
+
+
+TOPIC = {"id": "greetings", "name": "Greetings", "level": "BASIC"}
+WORDS = ["hello", "hi", "good morning", "goodbye", "bye"]
+
+
+@pytest.fixture
+def generator(tmp_path):
+    gen = WordsFromWordExGenerator(output_dir=str(tmp_path / "word"))
+    gen.generate_topic_words = lambda index, topic, items: [
+        {"en": en, "topic": topic["id"]} for en in items]
+    return gen
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return SQLiteWorkQueue(str(tmp_path / "queue.sqlite"), lease_sec=60, max_attempts=2)
+
+
+def _output_path(generator) -> str:
+    return os.path.join(generator.output_dir, "01_greetings.json")
+
+
+def _results(task, generator):
+    return generator.generate_topic_words(task["topic_index"], task["topic"], task["items"])
+
+
+def _expire_leases(queue):
+    with closing(queue._connect()) as conn:
+        conn.execute("UPDATE tasks SET lease_expires = ? WHERE status = 'leased'", (time.time() - 1,))
+
+
+def _status(queue, task_id: str) -> str:
+    with closing(queue._connect()) as conn:
+        return conn.execute("SELECT status FROM tasks WHERE task_id = ?", (task_id,)).fetchone()[0]
+
+
+def test_commit_with_stale_lease_is_rejected(queue, generator):
+    queue.enqueue_topic(1, TOPIC, WORDS)
+    stale = queue.claim("w1")
+    _expire_leases(queue)
+    fresh = queue.claim("w2")
+    assert fresh["task_id"] == stale["task_id"]
+    assert fresh["lease_token"] != stale["lease_token"]
+
+    assert queue.heartbeat("w1", stale) is False
+    assert queue.complete("w1", stale, _results(stale, generator), generator) is False
+    assert not os.path.exists(_output_path(generator))
+
+    assert queue.complete("w2", fresh, _results(fresh, generator), generator) is True
+    # A second commit of the same lease is a no-op
+    assert queue.complete("w2", fresh, _results(fresh, generator), generator) is False
+    stats = queue.stats()
+    assert stats["depth"] == {"done": 1}
+    assert stats["topics_written"] == 1
+
+
+def test_last_batch_writes_topic_in_batch_order(queue, generator):
+    assert queue.enqueue_topic(1, TOPIC, WORDS, batch_size=2) == 3
+    tasks = [queue.claim("w1") for _ in range(3)]
+    assert queue.claim("w1") is None
+
+    # Commit out of order: the file appears only with the last outstanding batch
+    for task in (tasks[2], tasks[0]):
+        assert queue.complete("w1", task, _results(task, generator), generator)
+        assert not os.path.exists(_output_path(generator))
+    assert queue.complete("w1", tasks[1], _results(tasks[1], generator), generator)
+
+    with open(_output_path(generator), "r", encoding="utf-8") as f:
+        assert [it["en"] for it in json.load(f)] == WORDS
+    assert queue.stats()["topics_written"] == 1
+
+
+def test_fail_returns_task_to_pending_then_failed(queue, generator):
+    queue.enqueue_topic(1, TOPIC, WORDS)
+    task = queue.claim("w1")
+    queue.fail(task, "timeout")
+    assert _status(queue, task["task_id"]) == "pending"
+
+    task = queue.claim("w1")
+    assert task["attempts"] == 1  # row as read before this claim's increment
+    queue.fail(task, "timeout")
+    assert _status(queue, task["task_id"]) == "failed"
+    assert queue.claim("w1") is None
+    assert queue.next_wakeup() is None
+
+
+def test_fail_with_lost_lease_is_ignored(queue, generator):
+    queue.enqueue_topic(1, TOPIC, WORDS)
+    stale = queue.claim("w1")
+    _expire_leases(queue)
+    fresh = queue.claim("w2")
+    queue.fail(stale, "late error")
+    assert _status(queue, fresh["task_id"]) == "leased"
+
+
+def test_idle_worker_waits_for_crashed_lease(tmp_path, generator):
+    queue = SQLiteWorkQueue(str(tmp_path / "queue.sqlite"), lease_sec=1, max_attempts=3)
+    queue.enqueue_topic(1, TOPIC, WORDS)
+    assert queue.claim("crashed") is not None
+    assert queue.next_wakeup() > time.time()
+
+    QueueWorker(queue, generator, worker_id="w2", heartbeat_sec=1, poll_sec=1).run()
+
+    with open(_output_path(generator), "r", encoding="utf-8") as f:
+        assert len(json.load(f)) == len(WORDS)
+    with closing(sqlite3.connect(queue.db_path)) as conn:
+        assert conn.execute("SELECT worker_id, status FROM tasks").fetchall() == [("w2", "done")]
+
+
+def test_api_failure_fails_task_instead_of_committing_stubs(tmp_path):
+    gen = WordsFromWordExGenerator(output_dir=str(tmp_path / "word"), attempts=1, backoff_sec=0)
+    gen.call_api = lambda messages: ""  # what call_api returns on HTTP errors
+    queue = SQLiteWorkQueue(str(tmp_path / "queue.sqlite"), lease_sec=60, max_attempts=2)
+    queue.enqueue_topic(1, TOPIC, WORDS)
+
+    QueueWorker(queue, gen, worker_id="w1", poll_sec=1).run()
+
+    assert not os.path.exists(_output_path(gen))
+    with closing(sqlite3.connect(queue.db_path)) as conn:
+        status, attempts, error = conn.execute("SELECT status, attempts, last_error FROM tasks").fetchone()
+    assert (status, attempts) == ("failed", 2)
+    assert "No valid JSON array" in error
+
+
+def test_unenriched_items_fail_task(tmp_path):
+    gen = WordsFromWordExGenerator(output_dir=str(tmp_path / "word"), attempts=1, backoff_sec=0, min_items=1)
+    # The list call succeeds without meanings; every enrichment call then fails
+    replies = iter([json.dumps([{"en": en} for en in WORDS])])
+    gen.call_api = lambda messages: next(replies, "")
+    # Same as _enrich_items without the rate-limit delay
+    gen._enrich_items = lambda topic, items: [gen._enrich_single_item(it, topic) for it in items]
+    queue = SQLiteWorkQueue(str(tmp_path / "queue.sqlite"), lease_sec=60, max_attempts=1)
+    queue.enqueue_topic(1, TOPIC, WORDS)
+
+    QueueWorker(queue, gen, worker_id="w1", poll_sec=1).run()
+
+    assert not os.path.exists(_output_path(gen))
+    assert queue.stats()["depth"] == {"failed": 1}
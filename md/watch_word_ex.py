@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Watch/daemon mode for generate_words_from_word_ex.py.
+
+Polls assets/data/word_ex/*.txt and topics.json, debounces bursts of edits and
+regenerates only what changed:
+  - word_ex list edited  → only added items go to the API; unchanged items are
+                           reused from the current topic JSON, removed ones dropped.
+  - topic edited in topics.json (name, level, description...) → that topic is
+                           regenerated in full; other topics are untouched.
+
+One generator instance lives for the whole session, so its HTTP session
+(keep-alive connections) and the per-topic item caches stay warm between runs.
+A small JSON status endpoint is served on localhost.
+
+CLI example (from project root):
+  python md/watch_word_ex.py \
+    --topics-file assets/data/topics.json \
+    --word-ex-dir assets/data/word_ex \
+    --output-dir assets/data/word \
+    --poll 2 --debounce 3 --status-port 8765
+
+  curl http://127.0.0.1:8765/status
+"""
+
+import os
+import json
+import time
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Dict, Any, Tuple, Optional
+
+from generate_words_from_word_ex import WordsFromWordExGenerator
+
+
+class WordExWatcher:
+    def __init__(self,
+                 generator: WordsFromWordExGenerator,
+                 poll_sec: float = 2.0,
+                 debounce_sec: float = 3.0,
+                 status_port: int = 8765,
+                 only_topics: Optional[List[str]] = None):
+        self.gen = generator
+        self.poll_sec = poll_sec
+        self.debounce_sec = debounce_sec
+        self.status_port = status_port
+        self.only_topics = only_topics
+
+        # Warm state kept between runs
+        self.topics_by_id: Dict[str, Dict[str, Any]] = {}
+        self.topic_files: Dict[str, Tuple[str, int]] = {}      # topic_id -> (word_ex path, index)
+        self.word_lists: Dict[str, List[str]] = {}              # topic_id -> last processed list
+        self.items_cache: Dict[str, Dict[str, Dict[str, Any]]] = {}  # topic_id -> {en_lower: item}
+        self.snapshot: Dict[str, Tuple[int, int]] = {}
+
+        self._lock = threading.Lock()
+        self.status: Dict[str, Any] = {
+            "started_at": time.time(),
+            "state": "starting",
+            "last_scan": None,
+            "pending_changes": [],
+            "runs": 0,
+            "api_items": 0,
+            "reused_items": 0,
+            "last_run": None,
+            "errors": [],
+            "topics_watched": 0,
+            "cached_items": 0,
+        }
+
+    # ---------------- Change detection ----------------
+    def _watched_paths(self) -> List[str]:
+        return [self.gen.topics_file] + self.gen.list_word_ex_files()
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        snap: Dict[str, Tuple[int, int]] = {}
+        for path in self._watched_paths():
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            snap[path] = (st.st_mtime_ns, st.st_size)
+        return snap
+
+    @staticmethod
+    def _diff(old: Dict[str, Tuple[int, int]], new: Dict[str, Tuple[int, int]]) -> List[str]:
+        return sorted(p for p in set(old) | set(new) if old.get(p) != new.get(p))
+
+    # ---------------- Warm caches ----------------
+    def _output_index(self, index: int, topic_id: str) -> int:
+        """Index prefix of the topic's existing output file, so edits update it in place
+        instead of creating a second file for the same topic."""
+        suffix = f"_{topic_id}.json"
+        if os.path.isdir(self.gen.output_dir):
+            for name in sorted(os.listdir(self.gen.output_dir)):
+                prefix = name[: -len(suffix)]
+                if name.endswith(suffix) and prefix.isdigit():
+                    return int(prefix)
+        return index
+
+    def _load_items(self, index: int, topic_id: str) -> Dict[str, Dict[str, Any]]:
+        path = os.path.join(self.gen.output_dir, f"{self._output_index(index, topic_id):02d}_{topic_id}.json")
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                items = json.load(f)
+        except Exception:
+            return {}
+        return {str(it.get("en", "")).lower(): it for it in items if isinstance(it, dict)}
+
+    def _refresh_topics(self) -> List[str]:
+        """Reload topics.json / file mapping. Returns ids whose topic definition changed."""
+        new_topics = {t.get("id"): t for t in self.gen.load_topics()}
+        changed = [tid for tid, t in new_topics.items()
+                   if tid in self.topics_by_id and self.topics_by_id[tid] != t]
+        self.topics_by_id = new_topics
+
+        files: Dict[str, Tuple[str, int]] = {}
+        # Several word_ex files may map to one topic; like run(), the last file wins
+        for path, index, topic in self.gen.resolve_topic_files(self.only_topics):
+            files[topic.get("id")] = (path, index)
+        self.topic_files = files
+        self._set_status(topics_watched=len(files))
+        return changed
+
+    def warm_up(self):
+        self._refresh_topics()
+        for topic_id, (path, index) in self.topic_files.items():
+            self.word_lists[topic_id] = self.gen.apply_canonical_map(self.gen.read_word_list(path))
+            self._cache_items(topic_id, self._load_items(index, topic_id))
+        self.snapshot = self._scan()
+        print(f"🔥 Warm: {len(self.topic_files)} topics, {self.status['cached_items']} cached items")
+
+    # ---------------- Regeneration ----------------
+    def _affected_topics(self, changed_paths: List[str]) -> Dict[str, bool]:
+        """topic_id -> full regeneration needed."""
+        affected: Dict[str, bool] = {}
+        if self.gen.topics_file in changed_paths:
+            for tid in self._refresh_topics():
+                affected[tid] = True
+        else:
+            self._refresh_topics()
+        path_to_topic = {p: tid for tid, (p, _) in self.topic_files.items()}
+        for p in changed_paths:
+            tid = path_to_topic.get(p)
+            if tid is not None:
+                affected.setdefault(tid, False)
+        # Topics whose file is new to the session
+        for tid in self.topic_files:
+            if tid not in self.word_lists:
+                affected.setdefault(tid, False)
+        # A topic without a word_ex file has nothing to regenerate
+        return {tid: full for tid, full in affected.items() if tid in self.topic_files}
+
+    def regenerate_topic(self, topic_id: str, full: bool) -> Tuple[int, int]:
+        path, index = self.topic_files[topic_id]
+        topic = self.topics_by_id[topic_id]
+        word_list = self.gen.apply_canonical_map(self.gen.read_word_list(path))[: self.gen.max_items]
+        cache = {} if full else self.items_cache.get(topic_id) or self._load_items(index, topic_id)
+
+        # Stubs left by a failed API call (no vi/sentence) are retried, not reused
+        missing = [w for w in word_list
+                   if w.lower() not in cache or self.gen.is_incomplete_item(cache[w.lower()])]
+        if missing:
+            print(f"\n🔷 [{index:02d}] {topic.get('name')}: {len(missing)} new/changed items "
+                  f"({len(word_list) - len(missing)} reused)")
+            for it in self.gen.generate_topic_words(index, topic, missing):
+                cache[str(it.get("en", "")).lower()] = it
+
+        items = [cache[w.lower()] for w in word_list if w.lower() in cache]
+        self.gen.save_topic_words(self._output_index(index, topic_id), topic_id, items)
+        self.word_lists[topic_id] = word_list
+        self._cache_items(topic_id, {str(it.get("en", "")).lower(): it for it in items})
+        return len(missing), len(word_list) - len(missing)
+
+    def process_changes(self, changed_paths: List[str]):
+        affected = self._affected_topics(changed_paths)
+        if not affected:
+            return
+        started = time.time()
+        self._set_status(state="regenerating")
+        api_items = reused = 0
+        done: List[str] = []
+        for topic_id, full in sorted(affected.items(), key=lambda kv: self.topic_files[kv[0]][1]):
+            try:
+                n_api, n_reused = self.regenerate_topic(topic_id, full)
+                api_items += n_api
+                reused += n_reused
+                done.append(topic_id)
+            except Exception as e:
+                print(f"❌ Failed to regenerate {topic_id}: {e}")
+                with self._lock:
+                    self.status["errors"] = (self.status["errors"] + [
+                        {"topic": topic_id, "error": str(e), "at": time.time()}])[-20:]
+        with self._lock:
+            self.status["runs"] += 1
+            self.status["api_items"] += api_items
+            self.status["reused_items"] += reused
+            self.status["last_run"] = {
+                "topics": done,
+                "api_items": api_items,
+                "reused_items": reused,
+                "duration_sec": round(time.time() - started, 2),
+                "finished_at": time.time(),
+            }
+        print(f"✅ Regenerated {len(done)} topics ({api_items} via API, {reused} reused)")
+
+    # ---------------- Status endpoint ----------------
+    def _set_status(self, **kwargs):
+        with self._lock:
+            self.status.update(kwargs)
+
+    def _cache_items(self, topic_id: str, items: Dict[str, Dict[str, Any]]):
+        # Keep the item count in status, so the HTTP thread never iterates items_cache
+        with self._lock:
+            self.items_cache[topic_id] = items
+            self.status["cached_items"] = sum(len(v) for v in self.items_cache.values())
+
+    def status_snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self.status)
+
+    def start_status_server(self) -> Optional[ThreadingHTTPServer]:
+        if not self.status_port:
+            return None
+        watcher = self
+
+        class StatusHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip("/") not in ("", "/status"):
+                    self.send_error(404)
+                    return
+                body = json.dumps(watcher.status_snapshot(), ensure_ascii=False).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", self.status_port), StatusHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        print(f"📡 Status: http://127.0.0.1:{self.status_port}/status")
+        return server
+
+    # ---------------- Main ----------------
+    def run(self, initial_run: bool = False):
+        server = self.start_status_server()
+        self.warm_up()
+        if initial_run:
+            self.process_changes(self._watched_paths())
+
+        pending: set = set()
+        last_change = 0.0
+        self._set_status(state="watching")
+        print(f"👀 Watching {self.gen.word_ex_dir} and {self.gen.topics_file} "
+              f"(poll={self.poll_sec}s, debounce={self.debounce_sec}s)")
+        try:
+            while True:
+                time.sleep(self.poll_sec)
+                snap = self._scan()
+                changed = self._diff(self.snapshot, snap)
+                self.snapshot = snap
+                if changed:
+                    pending.update(changed)
+                    last_change = time.time()
+                self._set_status(last_scan=time.time(),
+                                 pending_changes=sorted(os.path.basename(p) for p in pending))
+                # Wait for the edit burst to settle before regenerating
+                if pending and time.time() - last_change >= self.debounce_sec:
+                    batch = sorted(pending)
+                    pending.clear()
+                    self._set_status(pending_changes=[])
+                    self.process_changes(batch)
+                    self._set_status(state="watching")
+        except KeyboardInterrupt:
+            print("\n👋 Stopping watcher.")
+        finally:
+            if server is not None:
+                server.shutdown()
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Watch word_ex lists and topics.json and regenerate changed topics.")
+    p.add_argument("--topics-file", default="assets/data/topics.json")
+    p.add_argument("--word-ex-dir", default="assets/data/word_ex")
+    p.add_argument("--output-dir", default="assets/data/word")
+    p.add_argument("--attempts", type=int, default=3)
+    p.add_argument("--backoff", type=int, default=2)
+    p.add_argument("--min-items", type=int, default=20)
+    p.add_argument("--max-items", type=int, default=60)
+    p.add_argument("--only-topics", default="", help="Comma-separated topic ids to watch only")
+    p.add_argument("--canonical-map", default="", help="JSON map from dedupe_word_ex.py applied before prompting")
+    p.add_argument("--id-registry", default="md/word_id_registry.json",
+                   help="Word ID registry (word_ids.py); embeds stable 'id' fields (\"\" to disable)")
+    p.add_argument("--poll", type=float, default=2.0, help="Polling interval in seconds (default: 2).")
+    p.add_argument("--debounce", type=float, default=3.0, help="Quiet period before regenerating (default: 3).")
+    p.add_argument("--status-port", type=int, default=8765, help="Local status port (0 = disabled).")
+    p.add_argument("--initial-run", action="store_true", help="Sync every watched topic once at startup.")
+    return p.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    only_topics = [x.strip() for x in args.only_topics.split(",") if x.strip()] or None
+
+    gen = WordsFromWordExGenerator(
+        topics_file=args.topics_file,
+        word_ex_dir=args.word_ex_dir,
+        output_dir=args.output_dir,
+        attempts=args.attempts,
+        backoff_sec=args.backoff,
+        min_items=args.min_items,
+        max_items=args.max_items,
+        canonical_map_file=args.canonical_map or None,
+        id_registry_file=args.id_registry or None,
+    )
+    watcher = WordExWatcher(
+        gen,
+        poll_sec=args.poll,
+        debounce_sec=args.debounce,
+        status_port=args.status_port,
+        only_topics=only_topics,
+    )
+    print(f"🔧 attempts={args.attempts} | backoff={args.backoff}s | range={args.min_items}-{args.max_items}")
+    watcher.run(initial_run=args.initial_run)
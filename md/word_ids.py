@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Stable numeric word IDs for the generated corpus (assets/data/word).
+
+Every record gets a compact integer `id` (dWord.id in lib/model/word.dart)
+derived from its content key — topic + `en` folded by surface_form(): casing,
+spacing, curly quotes, contractions and punctuation — and persisted in an ID
+registry that is kept under version control. A regeneration that only changes
+"Hi" → "hi ", "I’m" → "I'm" or "I am from" → "I'm from" (as the
+dedupe_word_ex.py canonical map does) maps back to the same key and keeps its
+ID, so per-word progress keyed by ID survives content rebuilds. IDs are allocated sequentially and never
+reused, so the app can index progress arrays by ID.
+
+Registry format (JSON):
+  {"version": 2, "next_id": 8123, "ids": {"greetings_introductions/hello": 1, ...}}
+
+Version 1 registries (keys without contraction/punctuation folding) are
+re-keyed on load and written back as version 2.
+
+CLI examples (from project root):
+  # embed IDs into existing topic files (assigning new ones as needed)
+  python md/word_ids.py assign --word-dir assets/data/word --registry md/word_id_registry.json
+  # report records without IDs / IDs not matching the registry
+  python md/word_ids.py check --word-dir assets/data/word --registry md/word_id_registry.json
+"""
+
+import os
+import re
+import json
+import argparse
+import unicodedata
+from typing import List, Dict, Any, Tuple
+
+
+REGISTRY_VERSION = 2
+
+_CONTRACTIONS = [
+    (r"\bcan't\b", "can not"),
+    (r"\bwon't\b", "will not"),
+    (r"\bshan't\b", "shall not"),
+    (r"\blet's\b", "let us"),
+    (r"\bi'm\b", "i am"),
+    (r"n't\b", " not"),
+    (r"'re\b", " are"),
+    (r"'ll\b", " will"),
+    (r"'ve\b", " have"),
+    (r"'d\b", " would"),
+    (r"'s\b", " is"),
+]
+
+
+def surface_form(text: str) -> str:
+    """Contraction, quote, case and punctuation equivalence only.
+    Hyphens are kept: "check-in" (noun) is not "check in" (phrasal verb)."""
+    t = unicodedata.normalize("NFKC", str(text)).replace("’", "'").replace("‘", "'").casefold().strip()
+    for pattern, repl in _CONTRACTIONS:
+        t = re.sub(pattern, repl, t)
+    t = re.sub(r"[^\w\s-]", " ", t)
+    t = re.sub(r"\s*-\s*", "-", t)
+    return " ".join(t.split())
+
+
+def word_key(topic_id: str, en: str) -> str:
+    return f"{topic_id}/{surface_form(en)}"
+
+
+class WordIdRegistry:
+    def __init__(self, path: str = "md/word_id_registry.json"):
+        self.path = path
+        self.ids: Dict[str, int] = {}
+        self.next_id = 1
+        self.load()
+
+    # ---------------- IO ----------------
+    def load(self):
+        """(Re)load from disk; call before assigning when other processes may have written."""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        version = data.get("version")
+        if version not in (1, REGISTRY_VERSION):
+            raise ValueError(f"Unsupported word ID registry version: {version}")
+        ids = {k: int(v) for k, v in data.get("ids", {}).items()}
+        self.ids = ids if version == REGISTRY_VERSION else self._rekey(ids)
+        self.next_id = max(int(data.get("next_id", 1)), max(self.ids.values(), default=0) + 1)
+
+    @staticmethod
+    def _rekey(ids: Dict[str, int]) -> Dict[str, int]:
+        """Map version 1 keys to word_key(); when two keys fold together, the older ID wins."""
+        rekeyed: Dict[str, int] = {}
+        for key, word_id in sorted(ids.items(), key=lambda kv: kv[1]):
+            topic_id, _, en = key.partition("/")
+            new_key = word_key(topic_id, en)
+            if new_key in rekeyed:
+                print(f"⚠️  '{key}' (id {word_id}) folds into '{new_key}' (id {rekeyed[new_key]})")
+                continue
+            rekeyed[new_key] = word_id
+        return rekeyed
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": REGISTRY_VERSION, "next_id": self.next_id, "ids": self.ids},
+                      f, ensure_ascii=False, indent=0, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    # ---------------- Assignment ----------------
+    def get_or_assign(self, topic_id: str, en: str) -> int:
+        key = word_key(topic_id, en)
+        word_id = self.ids.get(key)
+        if word_id is None:
+            word_id = self.next_id
+            self.ids[key] = word_id
+            self.next_id += 1
+        return word_id
+
+    def assign_items(self, topic_id: str, items: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], int]:
+        """Return items with `id` as first field, plus the number of newly allocated IDs."""
+        before = self.next_id
+        result = []
+        used: Dict[int, str] = {}
+        for it in items:
+            word_id = self.get_or_assign(it.get("topic") or topic_id, it.get("en", ""))
+            if word_id in used:
+                raise ValueError(f"'{used[word_id]}' and '{it.get('en')}' share the key "
+                                 f"{word_key(it.get('topic') or topic_id, it.get('en', ''))}; "
+                                 f"merge them (e.g. --canonical-map) before saving")
+            used[word_id] = it.get("en", "")
+            rec = {"id": word_id}
+            rec.update({k: v for k, v in it.items() if k != "id"})
+            result.append(rec)
+        return result, self.next_id - before
+
+
+def _topic_id_from_file(fname: str) -> str:
+    m = re.match(r"^(?:\d+_)?([\w\-]+)\.json$", fname)
+    return m.group(1) if m else os.path.splitext(fname)[0]
+
+
+def _topic_files(word_dir: str) -> List[str]:
+    return sorted(f for f in os.listdir(word_dir) if f.endswith(".json"))
+
+
+def assign_corpus(word_dir: str, registry: WordIdRegistry) -> Dict[str, int]:
+    stats = {"files": 0, "records": 0, "new_ids": 0}
+    for fname in _topic_files(word_dir):
+        path = os.path.join(word_dir, fname)
+        with open(path, "r", encoding="utf-8") as f:
+            items = json.load(f)
+        items, new_ids = registry.assign_items(_topic_id_from_file(fname), items)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(items, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+        stats["files"] += 1
+        stats["records"] += len(items)
+        stats["new_ids"] += new_ids
+    registry.save()
+    return stats
+
+
+def check_corpus(word_dir: str, registry: WordIdRegistry) -> List[str]:
+    problems: List[str] = []
+    seen: Dict[int, str] = {}
+    for fname in _topic_files(word_dir):
+        with open(os.path.join(word_dir, fname), "r", encoding="utf-8") as f:
+            items = json.load(f)
+        topic_id = _topic_id_from_file(fname)
+        for it in items:
+            key = word_key(it.get("topic") or topic_id, it.get("en", ""))
+            word_id = it.get("id")
+            if word_id is None:
+                problems.append(f"{fname}: '{it.get('en')}' has no id")
+                continue
+            if registry.ids.get(key) != word_id:
+                problems.append(f"{fname}: '{it.get('en')}' id {word_id} != registry {registry.ids.get(key)}")
+            if word_id in seen and seen[word_id] != key:
+                problems.append(f"{fname}: id {word_id} shared by '{seen[word_id]}' and '{key}'")
+            seen[word_id] = key
+    return problems
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Assign / check stable numeric word IDs for topic word files.")
+    p.add_argument("command", choices=["assign", "check"])
+    p.add_argument("--word-dir", default="assets/data/word")
+    p.add_argument("--registry", default="md/word_id_registry.json", help="Path to the ID registry (JSON).")
+    return p.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    registry = WordIdRegistry(args.registry)
+    if args.command == "assign":
+        stats = assign_corpus(args.word_dir, registry)
+        print(f"🔢 {stats['records']} records in {stats['files']} files | {stats['new_ids']} new IDs "
+              f"| next_id={registry.next_id}")
+        print(f"💾 Saved registry: {args.registry}")
+    else:
+        problems = check_corpus(args.word_dir, registry)
+        for msg in problems[:50]:
+            print(f"❌ {msg}")
+        if problems:
+            print(f"❗ {len(problems)} problems")
+            raise SystemExit(1)
+        print("✅ All records carry registry IDs")
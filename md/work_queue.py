@@ -0,0 +1,460 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SQLite-backed work queue for sharded runs of generate_words_from_word_ex.py.
+
+Several worker processes (or hosts sharing the queue file) claim topic tasks or
+item batches with a lease, keep the lease alive with heartbeats while calling
+the API with their own credentials, and commit results exactly once: a commit
+is accepted only from the worker still holding the lease, and the topic file in
+assets/data/word is written (atomically) inside the same transaction once all
+batches of that topic are done. Expired leases are reclaimed by other workers;
+an idle worker only exits once no task is pending or leased any more.
+
+Note: over a network filesystem SQLite locking depends on the filesystem;
+a local disk or a share with working POSIX locks is assumed.
+
+CLI examples (from project root):
+  # 1) fill the queue (one task per topic, or --batch-size N items per task)
+  python md/work_queue.py enqueue --queue word_queue.sqlite --batch-size 20
+
+  # 2) start workers, each with its own key
+  DASHSCOPE_API_KEY=sk-... python md/work_queue.py work --queue word_queue.sqlite --worker-id w1
+
+  # 3) watch progress
+  python md/work_queue.py status --queue word_queue.sqlite
+"""
+
+import os
+import json
+import time
+import uuid
+import socket
+import sqlite3
+import argparse
+import threading
+from contextlib import closing
+from typing import List, Dict, Any, Optional
+
+from generate_words_from_word_ex import WordsFromWordExGenerator
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    task_id        TEXT PRIMARY KEY,
+    topic_id       TEXT NOT NULL,
+    topic_index    INTEGER NOT NULL,
+    batch_no       INTEGER NOT NULL,
+    batch_count    INTEGER NOT NULL,
+    topic          TEXT NOT NULL,
+    items          TEXT NOT NULL,
+    status         TEXT NOT NULL DEFAULT 'pending',
+    worker_id      TEXT,
+    lease_token    TEXT,
+    lease_expires  REAL,
+    attempts       INTEGER NOT NULL DEFAULT 0,
+    last_error     TEXT,
+    result         TEXT,
+    committed_at   REAL
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status, topic_index, batch_no);
+CREATE TABLE IF NOT EXISTS topics_done (
+    topic_id       TEXT PRIMARY KEY,
+    output_file    TEXT NOT NULL,
+    item_count     INTEGER NOT NULL,
+    written_at     REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS workers (
+    worker_id      TEXT PRIMARY KEY,
+    host           TEXT,
+    pid            INTEGER,
+    started_at     REAL NOT NULL,
+    last_heartbeat REAL NOT NULL,
+    tasks_done     INTEGER NOT NULL DEFAULT 0,
+    items_done     INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+class SQLiteWorkQueue:
+    def __init__(self,
+                 db_path: str = "word_queue.sqlite",
+                 lease_sec: int = 300,
+                 max_attempts: int = 3):
+        self.db_path = db_path
+        self.lease_sec = lease_sec
+        self.max_attempts = max_attempts
+        with closing(self._connect()) as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # isolation_level=None: transactions are managed explicitly with BEGIN IMMEDIATE
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    # ---------------- Producer ----------------
+    def enqueue_topic(self, index: int, topic: Dict[str, Any], items: List[str], batch_size: int = 0) -> int:
+        """Add one topic as a single task or as item batches; already queued topics are replaced
+        only if none of their tasks was committed yet."""
+        topic_id = topic.get("id", "")
+        if batch_size and batch_size > 0:
+            batches = [items[i:i + batch_size] for i in range(0, len(items), batch_size)] or [[]]
+        else:
+            batches = [items]
+
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            committed = conn.execute(
+                "SELECT COUNT(*) FROM tasks WHERE topic_id = ? AND status = 'done'", (topic_id,)
+            ).fetchone()[0]
+            if committed:
+                conn.execute("ROLLBACK")
+                print(f"⚠️  Topic {topic_id} already has committed results → skip")
+                return 0
+            conn.execute("DELETE FROM tasks WHERE topic_id = ?", (topic_id,))
+            for n, batch in enumerate(batches):
+                conn.execute(
+                    "INSERT INTO tasks (task_id, topic_id, topic_index, batch_no, batch_count, topic, items) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (f"{topic_id}#{n}", topic_id, index, n, len(batches),
+                     json.dumps(topic, ensure_ascii=False), json.dumps(batch, ensure_ascii=False)),
+                )
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+        return len(batches)
+
+    # ---------------- Worker side ----------------
+    def register_worker(self, worker_id: str):
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT INTO workers (worker_id, host, pid, started_at, last_heartbeat) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(worker_id) DO UPDATE SET host = excluded.host, pid = excluded.pid, "
+                "last_heartbeat = excluded.last_heartbeat",
+                (worker_id, socket.gethostname(), os.getpid(), now, now),
+            )
+
+    def claim(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """Lease the next pending task (or one whose lease expired). Returns None when drained."""
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            # Tasks that exhausted their attempts while leased are given up on
+            conn.execute(
+                "UPDATE tasks SET status = 'failed', lease_token = NULL "
+                "WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?",
+                (now, self.max_attempts),
+            )
+            row = conn.execute(
+                "SELECT * FROM tasks "
+                "WHERE status = 'pending' OR (status = 'leased' AND lease_expires < ?) "
+                "ORDER BY topic_index, batch_no LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            token = uuid.uuid4().hex
+            conn.execute(
+                "UPDATE tasks SET status = 'leased', worker_id = ?, lease_token = ?, lease_expires = ?, "
+                "attempts = attempts + 1 WHERE task_id = ?",
+                (worker_id, token, now + self.lease_sec, row["task_id"]),
+            )
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+        task = dict(row)
+        task["topic"] = json.loads(task["topic"])
+        task["items"] = json.loads(task["items"])
+        task["lease_token"] = token
+        return task
+
+    def next_wakeup(self) -> Optional[float]:
+        """When a claim may next succeed: now if tasks are pending, else the earliest lease
+        expiry. None once no task is pending or leased, i.e. the queue is really drained."""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT SUM(status = 'pending') AS pending, MIN(lease_expires) AS expires "
+                "FROM tasks WHERE status IN ('pending', 'leased')"
+            ).fetchone()
+        if row["pending"] is None:
+            return None
+        if row["pending"] or row["expires"] is None:
+            return time.time()
+        return row["expires"]
+
+    def heartbeat(self, worker_id: str, task: Optional[Dict[str, Any]] = None) -> bool:
+        """Refresh the worker's liveness and extend its lease. False if the lease was lost."""
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute("UPDATE workers SET last_heartbeat = ? WHERE worker_id = ?", (now, worker_id))
+            if task is None:
+                return True
+            cur = conn.execute(
+                "UPDATE tasks SET lease_expires = ? "
+                "WHERE task_id = ? AND status = 'leased' AND lease_token = ?",
+                (now + self.lease_sec, task["task_id"], task["lease_token"]),
+            )
+            return cur.rowcount == 1
+
+    def complete(self, worker_id: str, task: Dict[str, Any], items: List[Dict[str, Any]],
+                 generator: WordsFromWordExGenerator) -> bool:
+        """Commit a task result exactly once.
+
+        The result is accepted only if this worker still holds the lease. When it
+        is the last outstanding batch of its topic, the topic file is assembled and
+        written before the transaction commits, so a crash can only cause a redo,
+        never a lost or duplicated commit.
+        """
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            cur = conn.execute(
+                "UPDATE tasks SET status = 'done', result = ?, committed_at = ?, lease_token = NULL "
+                "WHERE task_id = ? AND status = 'leased' AND lease_token = ?",
+                (json.dumps(items, ensure_ascii=False), now, task["task_id"], task["lease_token"]),
+            )
+            if cur.rowcount != 1:
+                conn.execute("ROLLBACK")
+                print(f"⚠️  Lease lost for {task['task_id']} → result discarded")
+                return False
+
+            conn.execute(
+                "UPDATE workers SET tasks_done = tasks_done + 1, items_done = items_done + ?, "
+                "last_heartbeat = ? WHERE worker_id = ?",
+                (len(items), now, worker_id),
+            )
+            self._write_topic_if_complete(conn, task["topic_id"], generator)
+            conn.execute("COMMIT")
+            return True
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def fail(self, task: Dict[str, Any], error: str):
+        """Give the task back (or mark it failed once attempts are exhausted)."""
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                "lease_token = NULL, lease_expires = NULL, last_error = ? "
+                "WHERE task_id = ? AND status = 'leased' AND lease_token = ?",
+                (self.max_attempts, error[:500], task["task_id"], task["lease_token"]),
+            )
+
+    def _write_topic_if_complete(self, conn: sqlite3.Connection, topic_id: str,
+                                 generator: WordsFromWordExGenerator) -> bool:
+        rows = conn.execute(
+            "SELECT topic_index, batch_count, status, result FROM tasks WHERE topic_id = ? ORDER BY batch_no",
+            (topic_id,),
+        ).fetchall()
+        if not rows or any(r["status"] != "done" for r in rows) or len(rows) != rows[0]["batch_count"]:
+            return False
+        items: List[Dict[str, Any]] = []
+        for r in rows:
+            items.extend(json.loads(r["result"]))
+        index = rows[0]["topic_index"]
+        generator.save_topic_words(index, topic_id, items)
+        conn.execute(
+            "INSERT OR REPLACE INTO topics_done (topic_id, output_file, item_count, written_at) VALUES (?, ?, ?, ?)",
+            (topic_id, f"{index:02d}_{topic_id}.json", len(items), time.time()),
+        )
+        return True
+
+    def flush(self, generator: WordsFromWordExGenerator) -> int:
+        """Re-write every fully committed topic from the queue (e.g. into a fresh output dir)."""
+        conn = self._connect()
+        written = 0
+        try:
+            topic_ids = [r[0] for r in conn.execute("SELECT DISTINCT topic_id FROM tasks ORDER BY topic_index")]
+            for topic_id in topic_ids:
+                conn.execute("BEGIN IMMEDIATE")
+                if self._write_topic_if_complete(conn, topic_id, generator):
+                    written += 1
+                conn.execute("COMMIT")
+        finally:
+            conn.close()
+        return written
+
+    # ---------------- Coordinator ----------------
+    def stats(self) -> Dict[str, Any]:
+        now = time.time()
+        with closing(self._connect()) as conn:
+            depth = {r["status"]: r["n"] for r in conn.execute(
+                "SELECT status, COUNT(*) AS n FROM tasks GROUP BY status")}
+            expired = conn.execute(
+                "SELECT COUNT(*) FROM tasks WHERE status = 'leased' AND lease_expires < ?", (now,)
+            ).fetchone()[0]
+            topics_total = conn.execute("SELECT COUNT(DISTINCT topic_id) FROM tasks").fetchone()[0]
+            topics_written = conn.execute("SELECT COUNT(*) FROM topics_done").fetchone()[0]
+            workers = []
+            for r in conn.execute("SELECT * FROM workers ORDER BY worker_id"):
+                elapsed_min = max((r["last_heartbeat"] - r["started_at"]) / 60.0, 1e-9)
+                workers.append({
+                    "worker_id": r["worker_id"],
+                    "host": r["host"],
+                    "pid": r["pid"],
+                    "tasks_done": r["tasks_done"],
+                    "items_done": r["items_done"],
+                    "items_per_min": round(r["items_done"] / elapsed_min, 2),
+                    "last_heartbeat_sec_ago": round(now - r["last_heartbeat"], 1),
+                })
+        return {
+            "depth": depth,
+            "expired_leases": expired,
+            "topics_total": topics_total,
+            "topics_written": topics_written,
+            "workers": workers,
+        }
+
+
+class QueueWorker:
+    def __init__(self,
+                 queue: SQLiteWorkQueue,
+                 generator: WordsFromWordExGenerator,
+                 worker_id: Optional[str] = None,
+                 heartbeat_sec: int = 30,
+                 idle_exit: bool = True,
+                 poll_sec: int = 10):
+        self.queue = queue
+        self.generator = generator
+        # Stub results (API errors, bad key) go through fail(), never complete()
+        self.generator.raise_on_fallback = True
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.heartbeat_sec = heartbeat_sec
+        self.idle_exit = idle_exit
+        self.poll_sec = poll_sec
+
+    def _heartbeat_loop(self, task: Dict[str, Any], stop: threading.Event):
+        while not stop.wait(self.heartbeat_sec):
+            if not self.queue.heartbeat(self.worker_id, task):
+                print(f"⚠️  Lost lease on {task['task_id']}; result will be discarded")
+                return
+
+    def run(self):
+        self.queue.register_worker(self.worker_id)
+        print(f"👷 Worker {self.worker_id} started on {self.queue.db_path}")
+        while True:
+            task = self.queue.claim(self.worker_id)
+            if task is None:
+                # Other workers' leases may still expire (e.g. after a crash) and need a redo
+                wake_at = self.queue.next_wakeup()
+                if wake_at is None:
+                    if self.idle_exit:
+                        failed = self.queue.stats()["depth"].get("failed", 0)
+                        if failed:
+                            print(f"⚠️  {failed} tasks failed after {self.queue.max_attempts} attempts; "
+                                  f"their topics were not written")
+                        print("🎉 Queue drained, exiting.")
+                        return
+                    wake_at = time.time() + self.poll_sec
+                self.queue.heartbeat(self.worker_id)
+                time.sleep(min(self.poll_sec, max(wake_at - time.time(), 0.0) + 0.1))
+                continue
+
+            topic = task["topic"]
+            print(f"\n🔷 [{task['topic_index']:02d}] {topic.get('name')} "
+                  f"batch {task['batch_no'] + 1}/{task['batch_count']} ({len(task['items'])} items)")
+            if not task["items"]:
+                # Empty word list: commit an empty topic file, as run() does
+                self.queue.complete(self.worker_id, task, [], self.generator)
+                continue
+            stop = threading.Event()
+            beat = threading.Thread(target=self._heartbeat_loop, args=(task, stop), daemon=True)
+            beat.start()
+            try:
+                items = self.generator.generate_topic_words(task["topic_index"], topic, task["items"])
+            except Exception as e:
+                stop.set()
+                print(f"❌ Task {task['task_id']} failed: {e}")
+                self.queue.fail(task, str(e))
+                continue
+            stop.set()
+            beat.join()
+            if self.queue.complete(self.worker_id, task, items, self.generator):
+                print(f"✅ Committed {task['task_id']} → {len(items)} items")
+
+
+def print_stats(stats: Dict[str, Any]):
+    depth = stats["depth"]
+    print(f"📊 pending={depth.get('pending', 0)} | leased={depth.get('leased', 0)} "
+          f"(expired={stats['expired_leases']}) | done={depth.get('done', 0)} | failed={depth.get('failed', 0)}")
+    print(f"📁 topics written: {stats['topics_written']}/{stats['topics_total']}")
+    for w in stats["workers"]:
+        print(f"   👷 {w['worker_id']} @ {w['host']} (pid {w['pid']}): {w['tasks_done']} tasks, "
+              f"{w['items_done']} items, {w['items_per_min']} items/min, "
+              f"last heartbeat {w['last_heartbeat_sec_ago']}s ago")
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="SQLite work queue for sharded word generation.")
+    p.add_argument("command", choices=["enqueue", "work", "status", "flush"])
+    p.add_argument("--queue", default="word_queue.sqlite", help="Path to the SQLite queue file.")
+    p.add_argument("--topics-file", default="assets/data/topics.json")
+    p.add_argument("--word-ex-dir", default="assets/data/word_ex")
+    p.add_argument("--output-dir", default="assets/data/word")
+    p.add_argument("--only-topics", default="", help="Comma-separated topic ids to enqueue only")
+    p.add_argument("--canonical-map", default="", help="JSON map from dedupe_word_ex.py applied before enqueueing")
+    p.add_argument("--id-registry", default="md/word_id_registry.json",
+                   help="Word ID registry (word_ids.py); embeds stable 'id' fields (\"\" to disable)")
+    p.add_argument("--batch-size", type=int, default=0, help="Items per task (0 = one task per topic).")
+    p.add_argument("--lease", type=int, default=300, help="Lease duration in seconds (default: 300).")
+    p.add_argument("--heartbeat", type=int, default=30, help="Heartbeat interval in seconds (default: 30).")
+    p.add_argument("--max-attempts", type=int, default=3, help="Lease attempts per task before failing it.")
+    p.add_argument("--worker-id", default="", help="Worker name (default: host-pid).")
+    p.add_argument("--api-key-env", default="DASHSCOPE_API_KEY",
+                   help="Environment variable holding this worker's API key.")
+    p.add_argument("--wait", action="store_true", help="Keep polling when the queue is empty instead of exiting.")
+    p.add_argument("--poll", type=int, default=10,
+                   help="Max seconds an idle worker sleeps between claims (default: 10).")
+    p.add_argument("--attempts", type=int, default=3)
+    p.add_argument("--backoff", type=int, default=2)
+    p.add_argument("--min-items", type=int, default=20)
+    p.add_argument("--max-items", type=int, default=60)
+    return p.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    queue = SQLiteWorkQueue(args.queue, lease_sec=args.lease, max_attempts=args.max_attempts)
+
+    if args.command == "status":
+        print_stats(queue.stats())
+    else:
+        gen = WordsFromWordExGenerator(
+            topics_file=args.topics_file,
+            word_ex_dir=args.word_ex_dir,
+            output_dir=args.output_dir,
+            attempts=args.attempts,
+            backoff_sec=args.backoff,
+            min_items=args.min_items,
+            max_items=args.max_items,
+            canonical_map_file=args.canonical_map or None,
+            id_registry_file=args.id_registry or None,
+            api_key=os.getenv(args.api_key_env, "").strip() or None,
+        )
+        if args.command == "enqueue":
+            only_topics = [x.strip() for x in args.only_topics.split(",") if x.strip()] or None
+            # Several word_ex files may map to one topic; like run(), the last file wins
+            latest: Dict[str, Any] = {}
+            for path, index, topic in gen.resolve_topic_files(only_topics):
+                latest[topic.get("id")] = (path, index, topic)
+            total = 0
+            for path, index, topic in latest.values():
+                word_list = gen.apply_canonical_map(gen.read_word_list(path))
+                total += queue.enqueue_topic(index, topic, word_list[: gen.max_items], args.batch_size)
+            print(f"📥 Enqueued {total} tasks for {len(latest)} topics → {args.queue}")
+        elif args.command == "flush":
+            print(f"💾 Re-wrote {queue.flush(gen)} topics from {args.queue}")
+        else:
+            QueueWorker(queue, gen, worker_id=args.worker_id or None,
+                        heartbeat_sec=args.heartbeat, idle_exit=not args.wait, poll_sec=args.poll).run()